@@ -0,0 +1,106 @@
+"""
+Compares requests/sec and latency of the sync (threadpool) and async database stacks.
+
+The async stack is the real `main.app`. The sync stack is a minimal app serving
+the same read endpoints as plain `def` handlers on `database.get_sync_db`, which
+is how every route worked before the async port.
+
+Both stacks run without middleware and the async one without its response
+cache, so every request reaches the database and the numbers compare the
+database access paths rather than cache hits.
+
+Usage:
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from benchmarks.stats import summarize
+
+
+def build_sync_app() -> FastAPI:
+    # Imported here so `__main__` can configure the settings first
+    import models, schemas
+    from database import get_sync_db
+
+    app = FastAPI()
+
+    @app.get("/groups/", response_model=list[schemas.StudyGroupResponse])
+    def get_all_groups(db: Session = Depends(get_sync_db)):
+        return db.query(models.StudyGroup).order_by(models.StudyGroup.id).limit(100).all()
+
+    @app.get("/groups/{group_id}", response_model=schemas.StudyGroupResponse)
+    def get_group_by_id(group_id: int, db: Session = Depends(get_sync_db)):
+        group = db.query(models.StudyGroup).filter(models.StudyGroup.id == group_id).first()
+        if not group:
+            raise HTTPException(status_code=404, detail="Study group not found")
+        return group
+
+    @app.get("/resources/", response_model=list[schemas.ResourceResponse])
+    def get_all_resources(db: Session = Depends(get_sync_db)):
+        return db.query(models.Resource).order_by(models.Resource.id).limit(100).all()
+
+    return app
+
+
+async def run_load(app, paths, total, concurrency):
+    """Fires `total` GETs round-robin over `paths` with `concurrency` workers."""
+    latencies = []
+    counter = iter(range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{paths[i % len(paths)]} returned {response.status_code}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed)
+
+
+async def main(args):
+    import models
+    from database import SessionLocal
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.thread_limit
+
+    with SessionLocal() as db:
+        group_id = db.scalar(select(models.StudyGroup.id).order_by(models.StudyGroup.id))
+    if group_id is None:
+        raise SystemExit("No study groups in the database; seed some data first.")
+    paths = ["/groups/?limit=100", f"/groups/{group_id}", "/resources/?limit=100"]
+
+    from main import app as async_app
+
+    stacks = {"sync": build_sync_app(), "async": async_app}
+    print(f"{'stack':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, app in stacks.items():
+        await run_load(app, paths, min(args.requests, 100), args.concurrency)  # warm-up
+        result = await run_load(app, paths, args.requests, args.concurrency)
+        print(f"{name:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--thread-limit", type=int, default=40, help="anyio threadpool size (default 40)")
+    # Same (no) middleware on both stacks, and no cached responses on the async one
+    os.environ["METRICS_ENABLED"] = "false"
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,222 @@
+"""
+Drives a weighted mix of API calls against `main.app` in-process and reports
+throughput and p50/p95/p99 latency per route.
+
+Seed a database with `benchmarks.seed` first; the app is pointed at it through
+`DATABASE_URL` (`--database` is a shortcut that sets it).
+
+Usage:
+    python -m benchmarks.seed --database bench.db
+    python -m benchmarks.load --database bench.db --requests 5000 --concurrency 64 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+from benchmarks.seed import PASSWORD, email
+from benchmarks.stats import summarize
+
+
+async def login(client, ctx):
+    user_id = ctx.rng.randint(1, ctx.max_user)
+    return await client.post("/auth/login", json={"email": email(user_id), "password": PASSWORD})
+
+
+async def list_groups(client, ctx):
+    return await client.get("/groups/", params={"limit": 50, "after": ctx.rng.randint(0, ctx.max_group)})
+
+
+async def list_groups_expanded(client, ctx):
+    return await client.get(
+        "/groups/", params={"limit": 20, "after": ctx.rng.randint(0, ctx.max_group), "expand": "sessions,resources"},
+    )
+
+
+async def group_detail(client, ctx):
+    return await client.get(f"/groups/{ctx.rng.randint(1, ctx.max_group)}")
+
+
+async def group_full(client, ctx):
+    return await client.get(f"/groups/{ctx.rng.randint(1, ctx.max_group)}/full")
+
+
+async def group_sessions(client, ctx):
+    return await client.get("/sessions/", params={"group_id": ctx.rng.randint(1, ctx.max_group), "order": "asc"})
+
+
+async def upcoming_sessions(client, ctx):
+    return await client.get("/sessions/", params={"group_id": ctx.rng.randint(1, ctx.max_group), "upcoming": 5})
+
+
+async def list_resources(client, ctx):
+    return await client.get("/resources/", params={"limit": 50, "after": ctx.rng.randint(0, ctx.max_resource)})
+
+
+async def create_resource(client, ctx):
+    group_id = ctx.rng.randint(1, ctx.max_group)
+    return await client.post(
+        "/resources/", json={"group_id": group_id, "title": "Load test", "url": f"https://example.com/load/{group_id}"},
+    )
+
+
+async def create_session(client, ctx):
+    when = datetime.utcnow() + timedelta(hours=ctx.rng.randint(1, 24 * 90))
+    return await client.post(
+        "/sessions/",
+        json={"group_id": ctx.rng.randint(1, ctx.max_group), "scheduled_time": when.isoformat()},
+        headers=ctx.admin_headers,
+    )
+
+
+async def rejoin_group(client, ctx):
+    """Leave-then-join for one user; counted as a single operation."""
+    user_id = ctx.rng.randint(2, ctx.max_user)
+    await client.delete(f"/groups/leave-group/{user_id}")
+    return await client.post("/groups/join-group", json={"user_id": user_id, "group_id": ctx.rng.randint(1, ctx.max_group)})
+
+
+# (name, weight, call); weights are relative
+SCENARIOS = [
+    ("POST /auth/login", 5, login),
+    ("GET /groups/", 20, list_groups),
+    ("GET /groups/?expand", 5, list_groups_expanded),
+    ("GET /groups/{id}", 20, group_detail),
+    ("GET /groups/{id}/full", 5, group_full),
+    ("GET /sessions/?group_id", 15, group_sessions),
+    ("GET /sessions/?upcoming", 5, upcoming_sessions),
+    ("GET /resources/", 15, list_resources),
+    ("POST /resources/", 4, create_resource),
+    ("POST /sessions/", 2, create_session),
+    ("leave+join group", 4, rejoin_group),
+]
+
+
+class Context:
+    def __init__(self, seed: int, max_user: int, max_group: int, max_resource: int):
+        self.rng = random.Random(seed)
+        self.max_user = max_user
+        self.max_group = max_group
+        self.max_resource = max_resource
+        self.admin_headers = {}
+
+
+def dataset_bounds(database_url: str) -> tuple:
+    from sqlalchemy import create_engine, func, select
+    import models
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        bounds = tuple(
+            conn.scalar(select(func.coalesce(func.max(model.id), 0)))
+            for model in (models.User, models.StudyGroup, models.Resource)
+        )
+    engine.dispose()
+    return bounds
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    from config import settings
+    max_user, max_group, max_resource = dataset_bounds(settings.DATABASE_URL)
+    if not max_user or not max_group:
+        raise SystemExit("The database has no users or groups; run `python -m benchmarks.seed` first.")
+
+    from main import app
+
+    names = [name for name, _, _ in SCENARIOS]
+    weights = [weight for _, weight, _ in SCENARIOS]
+    calls = {name: call for name, _, call in SCENARIOS}
+    ctx = Context(args.seed, max_user, max_group, max_resource)
+    plan = ctx.rng.choices(names, weights=weights, k=args.requests)
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            response = await client.post("/auth/login", json={"email": email(1), "password": PASSWORD})
+            response.raise_for_status()
+            ctx.admin_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            queue = iter(plan)
+
+            async def worker():
+                for name in queue:
+                    start = time.perf_counter()
+                    response = await calls[name](client, ctx)
+                    latencies[name].append(time.perf_counter() - start)
+                    statuses[name][response.status_code] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    routes = {}
+    for name in names:
+        routes[name] = summarize(latencies[name], elapsed)
+        routes[name]["status"] = {str(code): count for code, count in sorted(statuses[name].items())}
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "database": {"url": settings.DATABASE_URL, "users": max_user, "groups": max_group, "resources": max_resource},
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "elapsed_s": elapsed,
+        "total": summarize([value for values in latencies.values() for value in values], elapsed),
+        "routes": routes,
+    }
+
+
+def print_report(result: dict):
+    print(f"{'route':<28}{'count':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  status")
+    rows = list(result["routes"].items()) + [("total", result["total"])]
+    for name, stats in rows:
+        if not stats["requests"]:
+            continue
+        status = " ".join(f"{code}:{count}" for code, count in stats.get("status", {}).items())
+        print(
+            f"{name:<28}{stats['requests']:>8}{stats['rps']:>10.1f}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}  {status}"
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="SQLite file to load; overrides DATABASE_URL")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    # Every simulated user shares one client IP; measure the API, not the limiter
+    os.environ.setdefault("AUTH_RATE_LIMIT_ENABLED", "false")
+    if args.database:
+        os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
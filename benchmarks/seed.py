@@ -0,0 +1,135 @@
+"""
+Generates a reproducible benchmark dataset.
+
+Creates (or extends) a SQLite database with the app's schema and fills users,
+study_groups, group_members, study_sessions and resources at the requested
+scale. Every user shares the password `benchmark`; `admin@example.com` is an
+admin.
+
+Usage:
+    python -m benchmarks.seed --database bench.db --users 1000000 --groups 50000
+"""
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+PASSWORD = "benchmark"
+ADMIN_EMAIL = "admin@example.com"
+
+
+def email(user_id: int) -> str:
+    """Login of a seeded user; user 1 is the admin."""
+    return ADMIN_EMAIL if user_id == 1 else f"user{user_id}@example.com"
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def insert(conn, sql, rows, batch_size):
+    count = 0
+    for chunk in chunked(rows, batch_size):
+        conn.executemany(sql, chunk)
+        conn.commit()
+        count += len(chunk)
+    return count
+
+
+def seed(args):
+    # Imported here so `benchmarks.load` can use `email()` before settings are read
+    import migrations
+    from core.hashing import hash_password
+
+    rng = random.Random(args.seed)
+
+    engine = create_engine(f"sqlite:///{args.database}")
+    with engine.begin() as conn:
+        migrations.run_migrations(conn)
+    engine.dispose()
+
+    conn = sqlite3.connect(args.database)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    password = hash_password(PASSWORD)  # one bcrypt hash shared by every user
+    now = datetime.utcnow().replace(microsecond=0)
+    timings = {}
+
+    def timed(name, sql, rows):
+        started = time.perf_counter()
+        count = insert(conn, sql, rows, args.batch_size)
+        timings[name] = (count, time.perf_counter() - started)
+
+    user_base = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users").fetchone()[0]
+    group_base = conn.execute("SELECT COALESCE(MAX(id), 0) FROM study_groups").fetchone()[0]
+
+    users = (
+        (user_id, f"User {user_id}", email(user_id), password, "admin" if user_id == 1 else "user")
+        for user_id in range(user_base + 1, user_base + args.users + 1)
+    )
+    timed("users", "INSERT INTO users (id, name, email, password, role) VALUES (?, ?, ?, ?, ?)", users)
+
+    groups = (
+        (group_base + i, f"Study group {group_base + i}", f"Benchmark group about topic {rng.randrange(1000)}")
+        for i in range(1, args.groups + 1)
+    )
+    timed("study_groups", "INSERT INTO study_groups (id, name, description) VALUES (?, ?, ?)", groups)
+
+    group_ids = range(group_base + 1, group_base + args.groups + 1)
+    members = (
+        (user_base + i, rng.choice(group_ids))
+        for i in range(1, args.users + 1)
+        if rng.random() < args.membership_ratio
+    )
+    timed("group_members", "INSERT INTO group_members (user_id, group_id) VALUES (?, ?)", members)
+
+    horizon = args.session_days * 24 * 3600
+    sessions = (
+        (group_id, now + timedelta(seconds=rng.randrange(-horizon, horizon)))
+        for group_id in group_ids
+        for _ in range(args.sessions_per_group)
+    )
+    timed("study_sessions", "INSERT INTO study_sessions (group_id, scheduled_time) VALUES (?, ?)",
+          ((group_id, when.isoformat(sep=" ")) for group_id, when in sessions))
+
+    resources = (
+        (group_id, f"Resource {n} of group {group_id}", f"https://example.com/groups/{group_id}/{n}")
+        for group_id in group_ids
+        for n in range(args.resources_per_group)
+    )
+    timed("resources", "INSERT INTO resources (group_id, title, url) VALUES (?, ?, ?)", resources)
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+    for table, (count, elapsed) in timings.items():
+        print(f"{table:<16}{count:>12,} rows {elapsed:>8.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="bench.db", help="SQLite file to create or extend")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--membership-ratio", type=float, default=0.8, help="Fraction of users that join a group")
+    parser.add_argument("--sessions-per-group", type=int, default=10)
+    parser.add_argument("--session-days", type=int, default=180, help="Sessions are spread over +/- this many days")
+    parser.add_argument("--resources-per-group", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per transaction")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+if __name__ == "__main__":
+    seed(build_parser().parse_args())
@@ -0,0 +1,86 @@
+"""
+Compares the list-endpoint serialization paths by walking whole tables page by page.
+
+- response_model: ORM objects encoded the way FastAPI does for a plain
+  `response_model` (validation, `jsonable_encoder`, stdlib json).
+- type_adapter: ORM objects validated `from_attributes` and dumped by a
+  precompiled `TypeAdapter` (the response cache path before `paginate_json`).
+- paginate_json: column tuples encoded by `RowEncoder` (orjson when installed).
+
+Usage:
+    python -m benchmarks.seed --database bench.db --users 100000 --groups 10000
+    python -m benchmarks.serialization --database bench.db --limit 1000
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def walk(fetch, page_cls, limit: int) -> tuple:
+    """Fetches every page through `fetch(page, response)`; returns (rows, bytes, seconds)."""
+    from fastapi import Response
+    from core.pagination import NEXT_CURSOR_HEADER
+
+    after, total_bytes, pages = None, 0, 0
+    started = time.perf_counter()
+    while True:
+        response = Response()
+        body = await fetch(page_cls(after=after, limit=limit, stream=None), response)
+        total_bytes += len(body)
+        pages += 1
+        after = response.headers.get(NEXT_CURSOR_HEADER)
+        if after is None:
+            return pages, total_bytes, time.perf_counter() - started
+
+
+async def main(args):
+    import json
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import func, select
+    import models, schemas
+    from core import serialization
+    from core.pagination import PageParams, paginate, paginate_json
+    from database import ReadSessionLocal
+
+    tables = {
+        "users": (models.User, schemas.UserResponse),
+        "study_groups": (models.StudyGroup, schemas.StudyGroupResponse),
+        "study_sessions": (models.StudySession, schemas.StudySessionResponse),
+        "resources": (models.Resource, schemas.ResourceResponse),
+    }
+
+    print(f"orjson: {'yes' if serialization.orjson is not None else 'no (TypeAdapter fallback)'}")
+    print(f"{'table':<16}{'path':<16}{'pages':>7}{'MB':>8}{'seconds':>9}{'rows/s':>12}")
+    async with ReadSessionLocal() as db:
+        for table, (model, schema) in tables.items():
+            adapter = TypeAdapter(list[schema])
+            count = await db.scalar(select(func.count()).select_from(model))
+
+            async def response_model(page, response):
+                rows = await paginate(db, model, page, response)
+                data = [schema.model_validate(row) for row in rows]
+                return json.dumps(jsonable_encoder(data)).encode()
+
+            async def type_adapter(page, response):
+                rows = await paginate(db, model, page, response)
+                return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+            async def fast(page, response):
+                return await paginate_json(db, model, schema, page, response)
+
+            for name, fetch in (("response_model", response_model), ("type_adapter", type_adapter), ("paginate_json", fast)):
+                pages, size, elapsed = await walk(fetch, PageParams, args.limit)
+                db.expunge_all()
+                print(f"{table:<16}{name:<16}{pages:>7}{size / 1e6:>8.1f}{elapsed:>9.2f}{count / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", help="SQLite file to read; overrides DATABASE_URL")
+    parser.add_argument("--limit", type=int, default=1000, help="Page size")
+    args = parser.parse_args()
+    if args.database:
+        os.environ["DATABASE_URL"] = f"sqlite:///{args.database}"
+    asyncio.run(main(args))
@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,6 +6,102 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 7 * 24 * 60  # ⏳ Token expiry time (adjust as needed)
     ALGORITHM: str = "HS256"  # 🔐 JWT Signing Algorithm
 
+    # Database engine
+    DATABASE_URL: str = "sqlite:///./study_group.db"
+    DB_POOL_SIZE: int = 5  # Persistent connections on the write engine
+    DB_READ_POOL_SIZE: int = 10  # Persistent connections per read engine (each replica)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed under burst
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = False  # Test connections on checkout
+    DB_READ_REPLICA_URLS: list[str] = []  # Read replicas for GET routes; JSON list in the environment
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 10  # How often replicas are health-checked
+    DB_REPLICA_CHECK_TIMEOUT: float = 2  # Seconds before a replica health check fails
+
+    # SQLite pragmas applied to every connection
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL lets readers run alongside a writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Safe with WAL, avoids an fsync per commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait for locks instead of failing with "database is locked"
+    SQLITE_CACHE_SIZE: int = -20000  # Page cache; negative values are KiB
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of the file to memory-map
+    SQLITE_FOREIGN_KEYS: bool = True  # Enforce FOREIGN KEY constraints
+    SQLITE_AUTO_VACUUM: str = "INCREMENTAL"  # New files only; run manage.py vacuum once to convert an existing file
+
+    # Schema management
+    RUN_MIGRATIONS_ON_STARTUP: bool = True  # Apply pending migrations when the app starts
+    CHECK_SCHEMA_ON_STARTUP: bool = True  # Log missing indexes and full table scans at startup
+    WARM_POOL_ON_STARTUP: bool = True  # Open the persistent DB connections before serving
+    COUNTER_RECONCILE_INTERVAL_SECONDS: float = 0  # Repair drifted group counters this often (0 = only via manage.py)
+
+    # List endpoints
+    PAGE_SIZE_DEFAULT: int = 100  # Rows per page when `limit` is not given
+    PAGE_SIZE_MAX: int = 1000  # Upper bound accepted for `limit`
+    STREAM_YIELD_PER: int = 500  # Rows fetched per batch in streaming mode
+    BULK_MAX_RESOURCES: int = 1000  # Largest batch accepted by POST /resources/bulk
+    BULK_MAX_SESSIONS: int = 1000  # Largest batch accepted by POST /sessions/bulk
+    BULK_MAX_MEMBERS: int = 1000  # Largest batch accepted by POST /groups/members/bulk
+
+    # Response cache for public GET endpoints
+    RESPONSE_CACHE_SIZE: int = 512  # Max cached responses (0 disables the cache)
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # Max total size of cached bodies
+    RESPONSE_CACHE_TTL_SECONDS: float = 30  # Max age of a cached response
+
+    # Study sessions
+    SESSIONS_UPCOMING_MAX: int = 50  # Largest `upcoming` value accepted per group
+    SESSION_DURATION_MINUTES: int = 60  # Event length used in calendar feeds
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 1024  # Max cached principals (0 disables the cache)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60  # Max staleness of a cached principal
+
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 2  # Processes dedicated to bcrypt
+    PASSWORD_HASH_CONCURRENCY: int = 2  # Hashes running at once
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting hashes before admission control rejects
+    PASSWORD_HASH_ADMISSION_CONTROL: bool = False  # Return 503 instead of queueing past the limit
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1  # Retry-After sent with 503
+
+    # Auth rate limiting (token buckets per client IP and per email)
+    AUTH_RATE_LIMIT_ENABLED: bool = True  # Rate-limit /auth/login and /auth/register
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 60  # Sustained auth requests per client IP
+    AUTH_RATE_LIMIT_IP_BURST: int = 20  # Requests a client IP may send at once
+    AUTH_RATE_LIMIT_EMAIL_PER_MINUTE: float = 10  # Sustained attempts per email address
+    AUTH_RATE_LIMIT_EMAIL_BURST: int = 5  # Attempts an email address may get at once
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # Buckets kept in memory; least recently used are evicted first
+    RATE_LIMIT_SWEEP_SECONDS: float = 60  # How often refilled (idle) buckets are dropped
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # Key on X-Forwarded-For (only behind a trusted proxy)
+
+    # Idempotency-Key support
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000  # Stored responses; least recently used are evicted first
+    IDEMPOTENCY_TTL_SECONDS: float = 86400  # How long a key replays its original response
+
+    # Change feed (GET /changes and its Server-Sent Events stream)
+    CHANGE_FEED_QUEUE_SIZE: int = 1000  # Events buffered per stream before a slow client is disconnected
+    CHANGE_FEED_POLL_SECONDS: float = 1  # How often streams check for writes made by other processes
+    CHANGE_FEED_KEEPALIVE_SECONDS: float = 15  # Idle time before a stream sends a keep-alive comment
+    CHANGE_LOG_RETENTION_DAYS: float = 30  # Age past which manage.py prune-changes deletes entries
+
+    # Session archival
+    SESSION_ARCHIVE_AFTER_DAYS: float = 365  # Sessions scheduled longer ago than this move to the archive
+    SESSION_ARCHIVE_INTERVAL_SECONDS: float = 0  # Archive this often from the app (0 = only via manage.py)
+    SESSION_ARCHIVE_BATCH_SIZE: int = 1000  # Sessions moved per transaction
+    SESSION_ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.05  # Pause between batches so other writers get the lock
+    SQLITE_INCREMENTAL_VACUUM_PAGES: int = 2000  # Free pages returned to the OS after each archive batch
+
+    # Bulk import / export
+    IMPORT_CHUNK_SIZE: int = 500  # Rows validated, hashed and inserted per transaction
+    IMPORT_MAX_ERRORS: int = 1000  # Row errors listed in the import report; the rest are only counted
+
+    # Session reminders
+    REMINDERS_ENABLED: bool = True  # Run the reminder scheduler in the app process
+    REMINDER_LEAD_MINUTES: float = 15  # How long before a session its reminder is sent
+    REMINDER_HORIZON_HOURS: float = 24  # Upcoming sessions kept in memory; reloaded as time moves on
+    REMINDER_SINK: Literal["log", "file"] = "log"  # Where reminders go: the app log or REMINDER_FILE
+    REMINDER_FILE: str = "reminders.ndjson"  # JSON-lines file written by the "file" sink
+
+    # Metrics
+    METRICS_ENABLED: bool = True  # Time requests and SQL, and serve /metrics
+    SERVER_TIMING_HEADER: bool = False  # Add a Server-Timing header (total and SQL time) to responses
+
     class Config:
         env_file = ".env"  # (Optional) Load settings from a .env file
 
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, bindparam, text
+from sqlalchemy.engine import Connection
+from core.response_cache import response_cache
+from core.changes import change_feed
+
+logger = logging.getLogger(__name__)
+
+
+def archive_batch(conn: Connection, before: datetime, batch_size: int) -> int:
+    """
+    Moves up to `batch_size` sessions scheduled before `before` into
+    study_sessions_archive, oldest first; returns how many moved.
+    - Starts with the INSERT so the write lock is taken up front and the
+      batch cannot conflict with a writer that committed after a read.
+    - Ids are kept; study_sessions is AUTOINCREMENT, so they are never
+      handed out again to a new session.
+    """
+    ids = conn.execute(text(
+        "INSERT INTO study_sessions_archive (id, group_id, scheduled_time, archived_at) "
+        "SELECT id, group_id, scheduled_time, CURRENT_TIMESTAMP FROM study_sessions "
+        "WHERE scheduled_time < :before ORDER BY scheduled_time LIMIT :limit RETURNING id"
+    ).bindparams(bindparam("before", type_=DateTime)), {"before": before, "limit": batch_size}).scalars().all()
+    if ids:
+        conn.execute(
+            text("DELETE FROM study_sessions WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids},
+        )
+    return len(ids)
+
+
+def incremental_vacuum(conn: Connection, pages: int) -> int:
+    """
+    Returns up to `pages` free pages to the OS (needs `auto_vacuum = INCREMENTAL`);
+    returns the free pages left.
+    """
+    if conn.dialect.name != "sqlite":
+        return 0
+    # The pragma frees pages as its result is stepped through; drain it or it stops early
+    result = conn.exec_driver_sql(f"PRAGMA incremental_vacuum({int(pages)})")
+    if result.returns_rows:
+        result.fetchall()
+    return conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+
+async def archive_sessions(async_engine, before: datetime, batch_size: int, pause: float, vacuum_pages: int) -> int:
+    """
+    Archives every session scheduled before `before`, one short transaction
+    per batch with `pause` seconds in between, and gives the freed pages
+    back with an incremental vacuum after each batch; returns how many moved.
+    """
+    moved = 0
+    while True:
+        async with async_engine.begin() as conn:
+            count = await conn.run_sync(archive_batch, before, batch_size)
+        if count:
+            moved += count
+            response_cache.bump("sessions")
+            change_feed.notify()
+        if vacuum_pages:
+            async with async_engine.connect() as conn:
+                await conn.run_sync(incremental_vacuum, vacuum_pages)
+        if count < batch_size:
+            return moved
+        await asyncio.sleep(pause)
+
+
+async def archive_periodically(async_engine, interval: float, age: timedelta, batch_size: int, pause: float, vacuum_pages: int):
+    """Runs `archive_sessions` for sessions older than `age` every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            moved = await archive_sessions(async_engine, datetime.utcnow() - age, batch_size, pause, vacuum_pages)
+        except Exception:
+            logger.exception("Session archival failed")
+            continue
+        if moved:
+            logger.info("Archived %s past sessions", moved)
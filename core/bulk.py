@@ -0,0 +1,46 @@
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas
+
+
+async def existing_ids(db: AsyncSession, column, ids) -> set:
+    """Returns the subset of `ids` present in `column`, in one query."""
+    ids = set(ids)
+    if not ids:
+        return set()
+    return set((await db.scalars(select(column).where(column.in_(ids)))).all())
+
+
+async def insert_valid(db: AsyncSession, model, rows: list, errors: dict) -> schemas.BulkResponse:
+    """
+    Inserts every row whose index is not in `errors` with one executemany,
+    reads the new ids back with one SELECT, commits once, and returns
+    per-item results.
+    - The INSERT takes SQLite's write lock, so no other writer can add rows
+      before the SELECT; the batch got the highest, consecutive ids, in order.
+    - A constraint violation from a concurrent write between the route's
+      checks and the INSERT (a user joining, a group deleted) rolls the
+      batch back with 409; nothing is inserted and the client can retry.
+    """
+    valid = [index for index in range(len(rows)) if index not in errors]
+    ids = []
+    if valid:
+        try:
+            await db.execute(insert(model.__table__), [rows[index] for index in valid])
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="The batch conflicts with a concurrent change; nothing was added. Retry the request.",
+            )
+        ids = sorted((await db.scalars(select(model.id).order_by(model.id.desc()).limit(len(valid)))).all())
+        await db.commit()
+
+    created = dict(zip(valid, ids))
+    results = [
+        schemas.BulkItemResult(index=index, id=created.get(index), error=errors.get(index))
+        for index in range(len(rows))
+    ]
+    return schemas.BulkResponse(created=len(created), failed=len(errors), results=results)
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire `ttl` seconds after being stored.
+    - Evicts the least recently used entry once `maxsize` is reached.
+    - With `weigher`, also keeps the total weight (e.g. bytes) under `max_weight`.
+    - Counts hits and misses so callers can export them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic, weigher=None, max_weight: int = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._weigher = weigher
+        self.max_weight = max_weight
+        self.weight = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        weight = self._weigher(value) if self._weigher else 0
+        if self._weigher and weight > self.max_weight:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, value, weight)
+            self.weight += weight
+            while len(self._entries) > self.maxsize or (self._weigher and self.weight > self.max_weight):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.weight -= entry[2]
+        return entry
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "weight": self.weight,
+        }
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Escapes TEXT values as required by RFC 5545."""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """
+    Folds a content line into lines of at most 75 octets (RFC 5545 §3.1),
+    without splitting a UTF-8 sequence, and ends it with CRLF.
+    """
+    data = line.encode()
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    start, limit = 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _timestamp(value: datetime) -> str:
+    # Session times are stored as naive UTC (see models.StudySession)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_header(name: str) -> str:
+    return (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Study Group Coordinator//Sessions//EN\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        + _fold(f"X-WR-CALNAME:{_escape(name)}")
+    )
+
+
+def calendar_event(session_id: int, start: datetime, summary: str, duration: timedelta, stamp: datetime) -> str:
+    return (
+        "BEGIN:VEVENT\r\n"
+        f"UID:study-session-{session_id}@study-group\r\n"
+        f"DTSTAMP:{_timestamp(stamp)}\r\n"
+        f"DTSTART:{_timestamp(start)}\r\n"
+        f"DTEND:{_timestamp(start + duration)}\r\n"
+        + _fold(f"SUMMARY:{_escape(summary)}")
+        + "END:VEVENT\r\n"
+    )
+
+
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from sqlalchemy import select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+import database, models, schemas
+from config import settings
+from core.serialization import adapter_for
+
+logger = logging.getLogger(__name__)
+
+# Entity name in the change log -> (table, JSON snapshot of a row as SQL over `{row}`)
+CHANGE_ENTITIES = {
+    "session": (
+        "study_sessions",
+        "json_object('id', {row}.id, 'group_id', {row}.group_id, "
+        "'scheduled_time', strftime('%Y-%m-%dT%H:%M:%f', {row}.scheduled_time))",
+    ),
+    "resource": (
+        "resources",
+        "json_object('id', {row}.id, 'group_id', {row}.group_id, 'title', {row}.title, 'url', {row}.url)",
+    ),
+}
+
+
+def create_change_triggers(conn: Connection):
+    """
+    Appends a `change_log` row for every insert, update and delete on the
+    tables in `CHANGE_ENTITIES`, in the same transaction as the write, so bulk
+    inserts and set-based deletes are logged like single-row routes.
+    - A row moved into its archive table (see `models.ARCHIVE_TABLES`) is
+      logged once as an `archive` change carrying its snapshot, not as a delete.
+    """
+    for entity, (table, snapshot) in CHANGE_ENTITIES.items():
+        columns = "INSERT INTO change_log (entity, entity_id, op, group_id, data) VALUES"
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_insert AFTER INSERT ON {table} BEGIN "
+            f"{columns} ('{entity}', new.id, 'insert', new.group_id, {snapshot.format(row='new')}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_update AFTER UPDATE ON {table} BEGIN "
+            f"{columns} ('{entity}', new.id, 'update', new.group_id, {snapshot.format(row='new')}); END"
+        ))
+        archive = models.ARCHIVE_TABLES.get(table)
+        guard = f"WHEN NOT EXISTS (SELECT 1 FROM {archive} WHERE id = old.id) " if archive else ""
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_change_delete AFTER DELETE ON {table} {guard}BEGIN "
+            f"{columns} ('{entity}', old.id, 'delete', old.group_id, NULL); END"
+        ))
+        if archive:
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {archive}_change_archive AFTER INSERT ON {archive} BEGIN "
+                f"{columns} ('{entity}', new.id, 'archive', new.group_id, {snapshot.format(row='new')}); END"
+            ))
+
+
+def prune_changes(conn: Connection, days: float) -> int:
+    """Deletes change log rows older than `days`; returns how many."""
+    return conn.execute(
+        text("DELETE FROM change_log WHERE changed_at < datetime('now', :age)"), {"age": f"-{days} days"}
+    ).rowcount
+
+
+def _change_statement(since: Optional[int], limit: int, entity: Optional[str] = None, group_id: Optional[int] = None):
+    stmt = select(
+        models.ChangeLog.id, models.ChangeLog.entity, models.ChangeLog.entity_id, models.ChangeLog.op,
+        models.ChangeLog.group_id, models.ChangeLog.data, models.ChangeLog.changed_at,
+    )
+    if since is not None:
+        stmt = stmt.where(models.ChangeLog.id > since)
+    if entity is not None:
+        stmt = stmt.where(models.ChangeLog.entity == entity)
+    if group_id is not None:
+        stmt = stmt.where(models.ChangeLog.group_id == group_id)
+    return stmt.order_by(models.ChangeLog.id).limit(limit)
+
+
+async def fetch_changes(db: AsyncSession, since: Optional[int], limit: int, entity: Optional[str] = None,
+                        group_id: Optional[int] = None) -> list:
+    """Returns up to `limit` changes after the cursor `since`, oldest first, with `data` decoded."""
+    rows = (await db.execute(_change_statement(since, limit, entity, group_id))).mappings().all()
+    return [{**row, "data": json.loads(row["data"]) if row["data"] else None} for row in rows]
+
+
+async def oldest_change(db: AsyncSession) -> Optional[int]:
+    """Id of the oldest change still in the log (older ones were pruned)."""
+    return await db.scalar(select(models.ChangeLog.id).order_by(models.ChangeLog.id).limit(1))
+
+
+async def latest_change(db: AsyncSession) -> int:
+    """Id of the newest change in the log, or 0 when it is empty."""
+    return await db.scalar(select(models.ChangeLog.id).order_by(models.ChangeLog.id.desc()).limit(1)) or 0
+
+
+def sse_event(change: dict) -> bytes:
+    """Encodes one change as a Server-Sent Event whose id is the change cursor."""
+    body = adapter_for(schemas.ChangeResponse).dump_json(schemas.ChangeResponse.model_validate(change))
+    return b"id: %d\nevent: change\ndata: %s\n\n" % (change["id"], body)
+
+
+class Subscription:
+    """One SSE client's bounded queue of `(change, event)` pairs; `None` ends the stream."""
+
+    def __init__(self, feed: "ChangeFeed", queue_size: int):
+        self.feed = feed
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, item) -> bool:
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.feed._subscribers.discard(self)
+
+
+class ChangeFeed:
+    """
+    In-process fan-out of the change log to SSE subscribers.
+    - One pump task reads new `change_log` rows once per wake-up and offers
+      each event to every subscriber's bounded queue.
+    - Routes call `notify()` after committing; the pump also polls every
+      `poll_interval` seconds to pick up writes from other processes.
+    - A subscriber whose queue is full is disconnected rather than slowing
+      the others; it resumes from its last event id through the delta endpoint.
+    - The pump runs only while someone is subscribed.
+    """
+
+    def __init__(self, queue_size: int, poll_interval: float, batch_size: int):
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._subscribers = set()
+        self._wakeup = None
+        self._task = None
+        self._last_id = None
+        self.published = 0
+        self.dropped = 0
+
+    def notify(self):
+        """Wakes the pump after a commit that may have written to the change log."""
+        if self._subscribers:
+            self._wakeup.set()
+
+    async def subscribe(self) -> Subscription:
+        """
+        Registers a subscriber that receives every change committed from now on.
+        - Starts the pump at the newest change if it is not running, so
+          anything a caller then reads from the log overlaps the live events.
+        """
+        if self._task is None or self._task.done():
+            async with database.AsyncSessionLocal() as db:
+                start = await latest_change(db)
+            if self._task is None or self._task.done():
+                self._last_id = start
+                self._wakeup = asyncio.Event()
+                self._task = asyncio.create_task(self._pump())
+        subscription = Subscription(self, self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    async def _pump(self):
+        while self._subscribers:
+            try:
+                async with database.AsyncSessionLocal() as db:
+                    changes = await fetch_changes(db, self._last_id, self.batch_size)
+            except Exception:
+                logger.exception("Reading the change log failed")
+                changes = []
+            for change in changes:
+                self._publish(change, sse_event(change))
+                self._last_id = change["id"]
+            if len(changes) == self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _publish(self, change: dict, event: bytes):
+        for subscription in list(self._subscribers):
+            if not subscription.offer((change, event)):
+                subscription.close()
+                self.dropped += 1
+        self.published += 1
+
+    async def close(self):
+        """Ends every stream and stops the pump (used on shutdown)."""
+        for subscription in list(self._subscribers):
+            subscription.close()
+            try:
+                subscription.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped,
+            "cursor": self._last_id or 0,
+        }
+
+
+change_feed = ChangeFeed(
+    queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+    poll_interval=settings.CHANGE_FEED_POLL_SECONDS,
+    batch_size=settings.PAGE_SIZE_MAX,
+)
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from models import ARCHIVE_TABLES
+from core.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# Denormalized counter on study_groups -> child table counted per group
+GROUP_COUNTERS = {
+    "member_count": "group_members",
+    "session_count": "study_sessions",
+    "resource_count": "resources",
+}
+
+
+def _archive_guard(table: str) -> str:
+    """WHEN clause that skips the delete half of a move into the table's archive."""
+    archive = ARCHIVE_TABLES.get(table)
+    return f"WHEN NOT EXISTS (SELECT 1 FROM {archive} WHERE id = old.id) " if archive else ""
+
+
+def create_counter_triggers(conn: Connection):
+    """
+    Keeps every counter in `GROUP_COUNTERS` up to date from triggers, so it
+    changes in the same transaction as the child insert, delete or move,
+    whichever code path (route, bulk insert, set-based delete) wrote it.
+    - Archived rows still count: moving a row into its archive table leaves
+      the counter alone, deleting it from the archive decrements it.
+    """
+    for counter, table in GROUP_COUNTERS.items():
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_{counter}_insert AFTER INSERT ON {table} BEGIN "
+            f"UPDATE study_groups SET {counter} = {counter} + 1 WHERE id = new.group_id; END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_{counter}_delete AFTER DELETE ON {table} {_archive_guard(table)}BEGIN "
+            f"UPDATE study_groups SET {counter} = {counter} - 1 WHERE id = old.group_id; END"
+        ))
+        if table in ARCHIVE_TABLES:
+            archive = ARCHIVE_TABLES[table]
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {archive}_{counter}_delete AFTER DELETE ON {archive} BEGIN "
+                f"UPDATE study_groups SET {counter} = {counter} - 1 WHERE id = old.group_id; END"
+            ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_{counter}_move AFTER UPDATE OF group_id ON {table} "
+            f"WHEN old.group_id IS NOT new.group_id BEGIN "
+            f"UPDATE study_groups SET {counter} = {counter} - 1 WHERE id = old.group_id; "
+            f"UPDATE study_groups SET {counter} = {counter} + 1 WHERE id = new.group_id; END"
+        ))
+
+
+def reconcile_counters(conn: Connection) -> dict:
+    """
+    Recomputes every group counter from the child tables (and their archives).
+    - Only rows that drifted are rewritten.
+    - Returns the number of groups repaired per counter.
+    """
+    repaired = {}
+    for counter, table in GROUP_COUNTERS.items():
+        actual = " + ".join(
+            f"(SELECT COUNT(*) FROM {source} WHERE {source}.group_id = study_groups.id)"
+            for source in (table, ARCHIVE_TABLES.get(table)) if source
+        )
+        actual = f"({actual})"
+        result = conn.execute(text(
+            f"UPDATE study_groups SET {counter} = {actual} WHERE {counter} IS NOT {actual}"
+        ))
+        repaired[counter] = result.rowcount
+        if result.rowcount:
+            logger.warning("Repaired %s on %s groups", counter, result.rowcount)
+    return repaired
+
+
+async def reconcile_periodically(async_engine, interval: float):
+    """Runs `reconcile_counters` every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_engine.begin() as conn:
+                repaired = await conn.run_sync(reconcile_counters)
+        except Exception:
+            logger.exception("Group counter reconciliation failed")
+            continue
+        if any(repaired.values()):
+            response_cache.bump("groups")
@@ -0,0 +1,115 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from config import settings
+
+# Password hashing configuration
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Hash password
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+# Verify password
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+# Hash a batch of passwords in one worker call
+def hash_passwords(passwords: list) -> list:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated process pool so it never blocks the event loop.
+    - At most `concurrency` hashes run at once; the rest wait in a queue.
+    - With `admission_control`, callers beyond `max_queue` waiting requests
+      are rejected with 503 and a `Retry-After` header instead of queueing.
+    """
+
+    def __init__(self, workers: int, concurrency: int, max_queue: int, admission_control: bool, retry_after: int):
+        self.workers = workers
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.admission_control = admission_control
+        self.retry_after = retry_after
+        self._executor = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Spawned (not forked) workers only import this module, not the app.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.admission_control and self.queued >= self.max_queue and self._semaphore.locked():
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry later.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: list) -> list:
+        """
+        Hashes a batch in parallel, one slice per worker, so bulk imports pay
+        one round trip per worker instead of one per password.
+        """
+        size = max(1, -(-len(passwords) // self.workers))
+        slices = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+        hashed = await asyncio.gather(*(self._run(hash_passwords, part) for part in slices))
+        return [value for part in hashed for value in part]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    concurrency=settings.PASSWORD_HASH_CONCURRENCY,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    admission_control=settings.PASSWORD_HASH_ADMISSION_CONTROL,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from fastapi import HTTPException, Request, Response
+from core.cache import TTLCache
+from core.serialization import adapter_for
+from config import settings
+
+# Header clients send to make a retried write safe
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Header set on responses replayed from the cache
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status_code", "body")
+
+    def __init__(self, fingerprint: bytes, status_code: int, body: bytes):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyCache:
+    """
+    Bounded `Idempotency-Key` -> response store for unsafe requests.
+    - The first request with a key runs; its response (success or 4xx) is
+      stored and replayed for every retry without touching the database.
+    - Reusing a key with a different body is rejected with 422, and a retry
+      arriving while the first request still runs gets 409.
+    - 5xx errors are not stored, so the client can retry them.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight = set()
+        self.replayed = 0
+
+    async def run(self, request: Request, key: str, response_type, call) -> Response:
+        """Runs `call()` once per `(method, path, key)` and returns its response encoded as `response_type`."""
+        scope = (request.method, request.url.path, key)
+        fingerprint = hashlib.blake2b(await request.body(), digest_size=16).digest()
+
+        stored = self._responses.get(scope)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used for a different request.")
+            self.replayed += 1
+            return Response(
+                content=stored.body, status_code=stored.status_code,
+                media_type="application/json", headers={REPLAYED_HEADER: "true"},
+            )
+        if scope in self._in_flight:
+            raise HTTPException(status_code=409, detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress.")
+
+        self._in_flight.add(scope)
+        try:
+            try:
+                adapter = adapter_for(response_type)
+                status_code, body = 200, adapter.dump_json(adapter.validate_python(await call(), from_attributes=True))
+            except HTTPException as exc:
+                if exc.status_code >= 500:
+                    raise
+                status_code, body = exc.status_code, json.dumps({"detail": exc.detail}).encode()
+            self._responses.set(scope, StoredResponse(fingerprint, status_code, body))
+        finally:
+            self._in_flight.discard(scope)
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    def stats(self) -> dict:
+        stats = self._responses.stats()
+        stats["replayed"] = self.replayed
+        stats["in_flight"] = len(self._in_flight)
+        return stats
+
+
+idempotency_cache = IdempotencyCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS)
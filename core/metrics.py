@@ -0,0 +1,263 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus layout (`le` buckets, sum and count)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """Yields `(le, cumulative count)` including `+Inf`."""
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield str(bound), running
+        yield "+Inf", self.count
+
+
+class RequestStats:
+    """
+    SQL work done on behalf of one request; filled in by the engine listeners.
+    - With `capture`, `statements` keeps `(sql, seconds)` per statement and
+      `rows` counts the rows returned by session SELECTs (streamed results excepted).
+    """
+
+    __slots__ = ("queries", "sql_seconds", "rows", "statements")
+
+    def __init__(self, capture: bool = False):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.statements = [] if capture else None
+
+
+# Stats of the request being handled in the current task, if any
+current_request = contextvars.ContextVar("current_request", default=None)
+
+
+class Metrics:
+    """
+    Process-wide request and SQL metrics rendered in the Prometheus text format.
+    - Requests are labelled by route template, never by raw path, so label
+      cardinality is bounded by the number of routes.
+    - Other components export their `stats()` dicts through `register()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries_per_request = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+        self.responses = defaultdict(int)
+        self.sql_seconds = defaultdict(float)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.capture_statements = False  # set by start_capture(); see tests/test_query_budget.py
+        self._collectors = {}
+        self._listeners = []
+
+    def register(self, name: str, stats):
+        """Exports every numeric value of `stats()` as a `<name>_<key>` gauge."""
+        self._collectors[name] = stats
+
+    def add_listener(self, listener):
+        """Calls `listener(method, route, status, seconds, sql)` after every request."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def start_capture(self):
+        """
+        Keeps the SQL and the fetched row count of each request for listeners.
+        - Installs the row-counting session hook, which buffers results, only
+          until `stop_capture()`; production traffic never goes through it.
+        """
+        self.capture_statements = True
+        if not event.contains(Session, "do_orm_execute", _count_rows):
+            event.listen(Session, "do_orm_execute", _count_rows)
+
+    def stop_capture(self):
+        if event.contains(Session, "do_orm_execute", _count_rows):
+            event.remove(Session, "do_orm_execute", _count_rows)
+        self.capture_statements = False
+
+    def record_request(self, method: str, route: str, status: int, seconds: float, sql: RequestStats):
+        with self._lock:
+            self.latency[(method, route)].observe(seconds)
+            self.queries_per_request[(method, route)].observe(sql.queries)
+            self.responses[(method, route, status)] += 1
+            self.sql_seconds[(method, route)] += sql.sql_seconds
+        for listener in self._listeners:
+            listener(method, route, status, seconds, sql)
+
+    def record_query(self, seconds: float):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+    def render(self) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, series):
+            for (method, route), hist in sorted(series.items()):
+                labels = f'method="{method}",route="{_escape(route)}"'
+                for le, count in hist.samples():
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            family("http_requests_in_flight", "gauge", "Requests currently being handled.")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            family("http_responses_total", "counter", "Responses by route and status code.")
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+            family("http_request_duration_seconds", "histogram", "Request latency by route.")
+            histogram("http_request_duration_seconds", self.latency)
+
+            family("http_request_sql_queries", "histogram", "SQL statements executed per request.")
+            histogram("http_request_sql_queries", self.queries_per_request)
+
+            family("http_request_sql_seconds_total", "counter", "Time spent in SQL by route.")
+            for (method, route), seconds in sorted(self.sql_seconds.items()):
+                lines.append(f'http_request_sql_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds}')
+
+            family("db_queries_total", "counter", "SQL statements executed, inside or outside requests.")
+            lines.append(f"db_queries_total {self.queries}")
+            family("db_query_seconds_total", "counter", "Time spent executing SQL statements.")
+            lines.append(f"db_query_seconds_total {self.query_seconds}")
+
+        for name, stats in self._collectors.items():
+            for key, value in stats().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metric = f"{name}_{key}"
+                    family(metric, "gauge", f"{name} {key.replace('_', ' ')}.")
+                    lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+def instrument_engine(sync_engine):
+    """Counts and times every statement; also charges it to the current request."""
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        metrics.record_query(seconds)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += seconds
+            if stats.statements is not None:
+                stats.statements.append((statement, seconds))
+
+
+def _count_rows(orm_execute_state):
+    """
+    Charges the rows a session query (ORM or text SELECT) returns to the current
+    request; installed by `Metrics.start_capture()`. The result is buffered to
+    count it, so streamed (`yield_per`/`stream_results`) queries are left out.
+    """
+    stats = current_request.get()
+    if stats is None or stats.statements is None:
+        return None
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        return None
+    if state.execution_options.get("stream_results") or state.execution_options.get("yield_per"):
+        return None
+    result = state.invoke_statement()
+    if not getattr(result, "returns_rows", True):  # ORM results have no flag and always carry rows
+        return result
+    frozen = result.freeze()
+    stats.rows += len(frozen.data)
+    return frozen()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that times every HTTP request.
+    - Records latency, status code and SQL work under the matched route template.
+    - With `server_timing`, adds a `Server-Timing` header with total and SQL time.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture=metrics.capture_statements)
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    value = (
+                        f'app;dur={elapsed:.1f}, '
+                        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries"'
+                    )
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", value.encode())]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            current_request.reset(token)
+            route = scope.get("route")
+            metrics.record_request(
+                scope["method"], getattr(route, "path", "<unmatched>"), status,
+                time.perf_counter() - started, stats,
+            )
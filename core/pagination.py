@@ -0,0 +1,155 @@
+from typing import Literal, Optional
+from fastapi import HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+import database
+from config import settings
+from core.serialization import encoder_for
+
+# Header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+class PageParams:
+    """Query parameters shared by every list endpoint."""
+
+    def __init__(
+        self,
+        after: Optional[str] = Query(None, max_length=64, description="Return rows after this cursor (the X-Next-Cursor header of the previous page)."),
+        limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of rows to return."),
+        stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream rows as NDJSON or as a chunked JSON array."),
+    ):
+        self.after = after
+        self.limit = limit
+        self.stream = stream
+
+
+def encode_cursor(row_id: int, sort_column=None, sort_value=None) -> str:
+    """Cursor of a row: its id, or `<sort value>:<id>` when the list is sorted by `sort_column`."""
+    if sort_column is None:
+        return str(row_id)
+    if hasattr(sort_value, "isoformat"):
+        sort_value = sort_value.isoformat()
+    return f"{sort_value}:{row_id}"
+
+
+def decode_cursor(after: str, sort_column=None):
+    """
+    Parses a cursor made by `encode_cursor` into `(sort value, id)`.
+    - Raises 400 when it does not match the list's sort.
+    """
+    try:
+        if sort_column is None:
+            value, row_id = None, int(after)
+        else:
+            text, _, row_id = after.rpartition(":")
+            python_type = sort_column.type.python_type
+            value = python_type.fromisoformat(text) if hasattr(python_type, "fromisoformat") else python_type(text)
+            row_id = int(row_id)
+        if row_id < 0:
+            raise ValueError(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor; pass the X-Next-Cursor header value of the previous page.")
+    return value, row_id
+
+
+def keyset(stmt, model, after: Optional[str], sort_column=None, descending: bool = False):
+    """
+    Orders `stmt` by `(sort_column, id)` (or just `id`) and resumes after the
+    row at cursor `after`.
+    - A sorted list's cursor carries the row's sort value, so paging goes on
+      after that row is deleted or archived.
+    """
+    if after is not None:
+        value, after_id = decode_cursor(after, sort_column)
+    if sort_column is None:
+        if after is not None:
+            stmt = stmt.where(model.id > after_id)
+        return stmt.order_by(model.id)
+
+    key = tuple_(sort_column, model.id)
+    if after is not None:
+        cursor = tuple_(literal(value, sort_column.type), literal(after_id))
+        stmt = stmt.where(key < cursor if descending else key > cursor)
+    if descending:
+        return stmt.order_by(sort_column.desc(), model.id.desc())
+    return stmt.order_by(sort_column, model.id)
+
+
+async def paginate(db: AsyncSession, model, page: PageParams, response: Response, criteria=(), sort_column=None, descending=False, options=()):
+    """
+    Applies keyset pagination on `model.id` (optionally sorted by `sort_column`).
+    - `options` are passed to the query, e.g. eager loaders for relationships.
+    - Fetches one extra row to know whether another page exists.
+    - Sets the `X-Next-Cursor` header when it does.
+    """
+    limit = page.limit or settings.PAGE_SIZE_DEFAULT
+    stmt = keyset(select(model).options(*options).where(*criteria), model, page.after, sort_column, descending)
+
+    rows = (await db.scalars(stmt.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_value = getattr(last, sort_column.key) if sort_column is not None else None
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.id, sort_column, sort_value)
+    return rows
+
+
+async def paginate_json(db: AsyncSession, model, schema, page: PageParams, response: Response, criteria=(), sort_column=None, descending=False) -> bytes:
+    """
+    Same page as `paginate`, returned as encoded JSON bytes.
+    - Selects only `schema`'s columns as tuples and encodes them with
+      `RowEncoder`, skipping ORM objects and response-model validation.
+    """
+    encoder = encoder_for(schema)
+    limit = page.limit or settings.PAGE_SIZE_DEFAULT
+    stmt = keyset(select(*encoder.columns(model)).where(*criteria), model, page.after, sort_column, descending)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        sort_value = last[encoder.fields.index(sort_column.key)] if sort_column is not None else None
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[encoder.id_index], sort_column, sort_value)
+    return encoder.encode(rows)
+
+
+def stream_rows(model, schema, page: PageParams, criteria=(), sort_column=None, descending=False):
+    """
+    Streams every matching row of `model` serialized through `schema`.
+    - Selects only the schema's columns and iterates them with `yield_per`,
+      so memory stays flat regardless of table size.
+    - Opens its own session because the request-scoped one is closed
+      before the response body is sent.
+    """
+    encoder = encoder_for(schema)
+    stmt = select(*encoder.columns(model)).where(*criteria)
+    stmt = keyset(stmt, model, page.after, sort_column, descending)
+    if page.limit is not None:
+        stmt = stmt.limit(page.limit)
+
+    as_array = page.stream == "json"
+
+    async def body():
+        async with database.ReadSessionLocal() as db:
+            result = await db.stream(stmt.execution_options(yield_per=settings.STREAM_YIELD_PER))
+            first = True
+            if as_array:
+                yield b"["
+            async for rows in result.partitions():
+                items = encoder.encode_items(rows)
+                if as_array:
+                    yield (b"" if first else b",") + b",".join(items)
+                else:
+                    yield b"\n".join(items) + b"\n"
+                first = False
+            if as_array:
+                yield b"]"
+
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[page.stream])
@@ -0,0 +1,149 @@
+import math
+import threading
+import time
+from fastapi import HTTPException, Request
+from config import settings
+
+
+class RateLimitBackend:
+    """
+    Storage for token buckets.
+    - Subclass it to share limits between worker processes (e.g. a Redis
+      script doing the same refill-and-take); `AuthRateLimiter` only needs `take`.
+    """
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Takes one token from `key`'s bucket; returns 0 when allowed, otherwise seconds until a token is free."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryBackend(RateLimitBackend):
+    """
+    Per-process token buckets.
+    - At most `max_keys` buckets are kept; the least recently used is evicted first.
+    - Every `sweep_interval` seconds, buckets that have refilled completely are
+      dropped, since a full bucket behaves exactly like a missing one.
+    """
+
+    def __init__(self, max_keys: int, sweep_interval: float, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._buckets = {}  # key -> [tokens, updated_at, rate, burst]; insertion order is LRU order
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + sweep_interval
+        self.evicted = 0
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        with self._lock:
+            now = self._clock()
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                bucket = [float(burst), now, rate, burst]
+                if len(self._buckets) >= self.max_keys:
+                    del self._buckets[next(iter(self._buckets))]
+                    self.evicted += 1
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            self._buckets[key] = bucket
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+    def _sweep(self, now: float):
+        full = [
+            key for key, (tokens, updated_at, rate, burst) in self._buckets.items()
+            if tokens + (now - updated_at) * rate >= burst
+        ]
+        for key in full:
+            del self._buckets[key]
+        self.evicted += len(full)
+        self._next_sweep = now + self.sweep_interval
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), "max_keys": self.max_keys, "evicted": self.evicted}
+
+
+class AuthRateLimiter:
+    """
+    FastAPI dependency that rate-limits a router by client IP and by the
+    `email` in the JSON body, before any password hashing happens.
+    - Rejected requests get 429 with a `Retry-After` header.
+    - Counts allowed and rejected requests per key kind for /metrics.
+    """
+
+    def __init__(self, backend: RateLimitBackend, enabled: bool, ip_per_minute: float, ip_burst: int,
+                 email_per_minute: float, email_burst: int, trust_forwarded_for: bool):
+        self.backend = backend
+        self.enabled = enabled
+        self.limits = {
+            "ip": (ip_per_minute / 60, ip_burst),
+            "email": (email_per_minute / 60, email_burst),
+        }
+        self.trust_forwarded_for = trust_forwarded_for
+        self.allowed = 0
+        self.rejected = {"ip": 0, "email": 0}
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded_for:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def _email(self, request: Request):
+        # FastAPI has already read and cached the body for the route
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        email = body.get("email") if isinstance(body, dict) else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    async def __call__(self, request: Request):
+        if not self.enabled:
+            return
+        keys = [("ip", self.client_ip(request))]
+        email = await self._email(request)
+        if email:
+            keys.append(("email", email))
+
+        for kind, value in keys:
+            rate, burst = self.limits[kind]
+            wait = await self.backend.take(f"{kind}:{value}", rate, burst)
+            if wait > 0:
+                self.rejected[kind] += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many attempts, please retry later.",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+        self.allowed += 1
+
+    def stats(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected_ip": self.rejected["ip"],
+            "rejected_email": self.rejected["email"],
+            **self.backend.stats(),
+        }
+
+
+auth_rate_limit = AuthRateLimiter(
+    MemoryBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS, sweep_interval=settings.RATE_LIMIT_SWEEP_SECONDS),
+    enabled=settings.AUTH_RATE_LIMIT_ENABLED,
+    ip_per_minute=settings.AUTH_RATE_LIMIT_IP_PER_MINUTE,
+    ip_burst=settings.AUTH_RATE_LIMIT_IP_BURST,
+    email_per_minute=settings.AUTH_RATE_LIMIT_EMAIL_PER_MINUTE,
+    email_burst=settings.AUTH_RATE_LIMIT_EMAIL_BURST,
+    trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR,
+)
@@ -0,0 +1,237 @@
+import asyncio
+import heapq
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select
+import database, models
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pause before retrying after the database could not be read
+RETRY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """A notification due `lead` before a study session starts."""
+    session_id: int
+    group_id: int
+    scheduled_time: datetime
+    remind_at: datetime
+
+
+class ReminderSink:
+    """
+    Destination of due reminders.
+    - Subclass it to deliver them elsewhere (email, push, a queue); the
+      scheduler only needs `send`.
+    """
+
+    async def send(self, reminders: list):
+        raise NotImplementedError
+
+
+class LogSink(ReminderSink):
+    """Logs each reminder at INFO level."""
+
+    async def send(self, reminders: list):
+        for reminder in reminders:
+            logger.info(
+                "Reminder: session %s of group %s starts at %s",
+                reminder.session_id, reminder.group_id, reminder.scheduled_time.isoformat(),
+            )
+
+
+class FileSink(ReminderSink):
+    """Appends each reminder as one JSON line to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: str):
+        with open(self.path, "a") as handle:
+            handle.write(lines)
+
+    async def send(self, reminders: list):
+        lines = "".join(
+            json.dumps({
+                "session_id": reminder.session_id,
+                "group_id": reminder.group_id,
+                "scheduled_time": reminder.scheduled_time.isoformat(),
+                "remind_at": reminder.remind_at.isoformat(),
+            }) + "\n"
+            for reminder in reminders
+        )
+        await asyncio.to_thread(self._write, lines)
+
+
+def build_sink(config) -> ReminderSink:
+    if config.REMINDER_SINK == "file":
+        return FileSink(config.REMINDER_FILE)
+    return LogSink()
+
+
+class ReminderScheduler:
+    """
+    Sends a reminder `lead` before each study session through a `ReminderSink`.
+    - Keeps the reminders of the next `horizon` in a min-heap keyed by
+      reminder time, loaded with one range query on the scheduled_time
+      index, and sleeps until the earliest one is due.
+    - `add()` and `remove()` update the heap as sessions are created and
+      deleted; reminders further out are picked up when the window moves on.
+    - Removed reminders stay in the heap and are skipped when popped; due
+      reminders are re-checked against the table in one query, so sessions
+      deleted by group deletes or other processes are not announced.
+    - Delivery is at-least-once: after a restart, reminders for sessions
+      that have not started yet are sent again.
+    """
+
+    def __init__(self, sink: ReminderSink, lead: timedelta, horizon: timedelta, clock=datetime.utcnow):
+        self.sink = sink
+        self.lead = lead
+        self.horizon = horizon
+        self._clock = clock
+        self._heap = []  # (remind_at, session_id)
+        self._pending = {}  # session_id -> Reminder; heap entries missing here were removed
+        self._loaded_until = None  # reminders due before this are in the heap; None when not running
+        self._wakeup = None
+        self.loads = 0
+        self.sent = 0
+        self.skipped = 0
+        self.failed = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def _push(self, reminder: Reminder) -> bool:
+        if self._pending.get(reminder.session_id) == reminder:
+            return False
+        self._pending[reminder.session_id] = reminder
+        heapq.heappush(self._heap, (reminder.remind_at, reminder.session_id))
+        return True
+
+    def add(self, session_id: int, group_id: int, scheduled_time: Optional[datetime]):
+        """Schedules a new session's reminder if it falls inside the loaded window."""
+        if self._loaded_until is None or scheduled_time is None:
+            return
+        scheduled_time = scheduled_time.replace(tzinfo=None)  # stored without its offset, as the column does
+        if scheduled_time <= self._clock():
+            return
+        reminder = Reminder(session_id, group_id, scheduled_time, scheduled_time - self.lead)
+        if reminder.remind_at < self._loaded_until and self._push(reminder):
+            if self._heap[0][1] == session_id:
+                self._wakeup.set()
+
+    def remove(self, session_id: int):
+        """Cancels a deleted session's reminder."""
+        self._pending.pop(session_id, None)
+
+    async def _load(self, until: datetime):
+        """Loads the reminders due between the end of the loaded window and `until`."""
+        # Advance first: sessions created while the query runs are added by `add()`, duplicates are ignored
+        start, self._loaded_until = self._loaded_until, until
+        stmt = select(models.StudySession.id, models.StudySession.group_id, models.StudySession.scheduled_time).where(
+            models.StudySession.scheduled_time >= start + self.lead,  # the previous window stopped just before
+            models.StudySession.scheduled_time > self._clock(),
+            models.StudySession.scheduled_time < until + self.lead,
+        ).order_by(models.StudySession.scheduled_time)
+        try:
+            async with database.AsyncSessionLocal() as db:
+                rows = (await db.execute(stmt)).all()
+        except Exception:
+            self._loaded_until = start
+            raise
+        for session_id, group_id, scheduled_time in rows:
+            self._push(Reminder(session_id, group_id, scheduled_time, scheduled_time - self.lead))
+        self.loads += 1
+
+    def _pop_due(self, now: datetime) -> list:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            remind_at, session_id = heapq.heappop(self._heap)
+            reminder = self._pending.get(session_id)
+            if reminder is not None and reminder.remind_at == remind_at:
+                del self._pending[session_id]
+                due.append(reminder)
+        return due
+
+    async def _dispatch(self, due: list):
+        async with database.AsyncSessionLocal() as db:
+            ids = set((await db.scalars(
+                select(models.StudySession.id).where(models.StudySession.id.in_([r.session_id for r in due]))
+            )).all())
+        reminders = [reminder for reminder in due if reminder.session_id in ids]
+        self.skipped += len(due) - len(reminders)
+        if not reminders:
+            return
+        try:
+            await self.sink.send(reminders)
+        except Exception:
+            logger.exception("Sending %s reminders failed", len(reminders))
+            self.failed += len(reminders)
+            return
+        self.sent += len(reminders)
+        sent_at = self._clock()
+        self.last_lag = max((sent_at - reminder.remind_at).total_seconds() for reminder in reminders)
+        self.max_lag = max(self.max_lag, self.last_lag)
+
+    async def run(self):
+        """Loads the window and sends reminders as they fall due until cancelled."""
+        self._wakeup = asyncio.Event()
+        # The first load also covers sessions starting within `lead`, whose reminder is already due
+        self._loaded_until = self._clock() - self.lead
+        try:
+            while True:
+                now = self._clock()
+                # Move the window on once half of it has elapsed
+                if now + self.horizon / 2 >= self._loaded_until:
+                    try:
+                        await self._load(now + self.horizon)
+                    except Exception:
+                        logger.exception("Loading upcoming sessions failed")
+                        await asyncio.sleep(RETRY_SECONDS)
+                due = self._pop_due(now)
+                if due:
+                    try:
+                        await self._dispatch(due)
+                    except Exception:
+                        logger.exception("Dispatching reminders failed")
+                        self.failed += len(due)
+                    continue
+
+                next_at = self._loaded_until - self.horizon / 2
+                if self._heap:
+                    next_at = min(next_at, self._heap[0][0])
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max((next_at - now).total_seconds(), 0.01))
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            self._loaded_until = None
+            self._heap.clear()
+            self._pending.clear()
+
+    def stats(self) -> dict:
+        now = self._clock()
+        return {
+            "backlog": len(self._pending),
+            "overdue": sum(1 for reminder in self._pending.values() if reminder.remind_at <= now),
+            "heap_size": len(self._heap),
+            "loads": self.loads,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "lag_last_seconds": round(self.last_lag, 3),
+            "lag_max_seconds": round(self.max_lag, 3),
+        }
+
+
+reminder_scheduler = ReminderScheduler(
+    build_sink(settings),
+    lead=timedelta(minutes=settings.REMINDER_LEAD_MINUTES),
+    horizon=timedelta(hours=settings.REMINDER_HORIZON_HOURS),
+)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only sessions.
+    - Hands out healthy replicas round-robin; when none is healthy, reads
+      fall back to the primary.
+    - `check()` pings every replica; `monitor()` runs it periodically.
+    """
+
+    def __init__(self, primary, replicas: list, timeout: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.timeout = timeout
+        self.healthy = [True] * len(replicas)
+        self._next = 0
+        self.routed = [0] * len(replicas)
+        self.fallbacks = 0
+        self.failed_checks = 0
+
+    def pick(self):
+        for _ in range(len(self.replicas)):
+            index = self._next % len(self.replicas)
+            self._next += 1
+            if self.healthy[index]:
+                self.routed[index] += 1
+                return self.replicas[index]
+        self.fallbacks += 1
+        return self.primary
+
+    async def _ping(self, engine) -> bool:
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            return True
+        except Exception as exc:
+            logger.warning("Read replica %s failed its health check: %s", engine.url.render_as_string(hide_password=True), exc)
+            return False
+
+    async def check(self) -> list:
+        """Pings every replica and updates which ones receive reads; returns the health flags."""
+        results = await asyncio.gather(*(self._ping(engine) for engine in self.replicas))
+        for index, healthy in enumerate(results):
+            if healthy and not self.healthy[index]:
+                logger.info("Read replica %s is healthy again", self.replicas[index].url.render_as_string(hide_password=True))
+            self.failed_checks += not healthy
+        self.healthy = list(results)
+        return self.healthy
+
+    async def monitor(self, interval: float):
+        """Runs `check()` every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "healthy": sum(self.healthy),
+            "routed": sum(self.routed),
+            "fallbacks": self.fallbacks,
+            "failed_checks": self.failed_checks,
+        }
+
+
+class RoutingSession(Session):
+    """
+    Sync session class behind the read-only `AsyncSession`s.
+    - Flushes and INSERT/UPDATE/DELETE statements always go to the primary.
+    - Everything else goes to one replica picked by the router when the
+      session first needs it, so a request reads from a consistent copy.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router = self.info["router"]
+        if self._flushing or isinstance(clause, UpdateBase):
+            return router.primary.sync_engine
+        engine = self.info.get("replica")
+        if engine is None:
+            engine = self.info["replica"] = router.pick()
+        return engine.sync_engine
@@ -0,0 +1,88 @@
+import hashlib
+import uuid
+from fastapi import Request, Response
+from core.cache import TTLCache
+from core.serialization import adapter_for
+from config import settings
+
+
+class CachedBody:
+    __slots__ = ("body", "headers")
+
+    def __init__(self, body: bytes, headers: dict):
+        self.body = body
+        self.headers = headers
+
+
+class ResponseCache:
+    """
+    In-process cache of serialized GET responses with ETag revalidation.
+    - Every cached response depends on one or more collections; writers call
+      `bump()` after committing, which changes the ETag of every dependent URL.
+    - Entries are bounded by count, total bytes and TTL. The TTL also bounds
+      staleness when several worker processes each hold their own versions.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, weigher=lambda entry: len(entry.body), max_weight=max_bytes)
+        self._versions = {}
+        self._epoch = uuid.uuid4().hex[:8]
+        self.not_modified = 0
+
+    def bump(self, *collections: str):
+        """Invalidates every cached response that depends on `collections`."""
+        for collection in collections:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def etag(self, request: Request, collections) -> str:
+        versions = ",".join(f"{name}:{self._versions.get(name, 0)}" for name in collections)
+        key = f"{self._epoch}|{versions}|{request.url.path}?{request.url.query}"
+        return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+    async def serve(self, request: Request, collections, response_type, load, exclude_unset: bool = False) -> Response:
+        """
+        Answers a GET from the cache, or calls `load(response)` to build it.
+        - `load` receives a scratch `Response` whose headers are cached along with the body.
+        - `load` may return already encoded JSON bytes, which are cached as-is.
+        - `exclude_unset` drops fields `load` did not provide.
+        - Returns 304 when `If-None-Match` matches a still-cached entry.
+        """
+        etag = self.etag(request, collections)
+        cached = self._entries.get(etag)
+        if cached is not None and etag in request.headers.get("if-none-match", ""):
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        if cached is None:
+            scratch = Response()
+            data = await load(scratch)
+            if isinstance(data, bytes):
+                body = data
+            else:
+                adapter = adapter_for(response_type)
+                body = adapter.dump_json(adapter.validate_python(data, from_attributes=True), exclude_unset=exclude_unset)
+            headers = {
+                key: value for key, value in scratch.headers.items()
+                if key not in ("content-length", "content-type")
+            }
+            cached = CachedBody(body, headers)
+            self._entries.set(etag, cached)
+
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers={**cached.headers, "ETag": etag, "Cache-Control": "no-cache"},
+        )
+
+    def stats(self) -> dict:
+        stats = self._entries.stats()
+        stats["not_modified"] = self.not_modified
+        stats["bytes"] = stats.pop("weight")
+        return stats
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
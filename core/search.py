@@ -0,0 +1,84 @@
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# FTS5 index per searchable table: (index table, content table, indexed columns)
+SEARCH_INDEXES = (
+    ("study_groups_fts", "study_groups", ("name", "description")),
+    ("resources_fts", "resources", ("title", "url")),
+)
+
+# Weight of each indexed column in bm25(); the first (name/title) counts most
+COLUMN_WEIGHTS = "10.0, 1.0"
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_tables(conn: Connection):
+    """
+    Creates the external-content FTS5 tables and the triggers that keep them
+    in sync with every insert, update and delete on the content tables.
+    """
+    for index, table, columns in SEARCH_INDEXES:
+        column_list = ", ".join(columns)
+        new_values = ", ".join(f"new.{column}" for column in columns)
+        old_values = ", ".join(f"old.{column}" for column in columns)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{column_list}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {index} (rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {index} ({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column_list} ON {table} BEGIN "
+            f"INSERT INTO {index} ({index}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {index} (rowid, {column_list}) VALUES (new.id, {new_values}); END"
+        ))
+
+
+def rebuild_search_index(conn: Connection) -> dict:
+    """Re-indexes every row of the content tables; returns the row count per index."""
+    counts = {}
+    for index, table, _ in SEARCH_INDEXES:
+        conn.execute(text(f"INSERT INTO {index} ({index}) VALUES ('rebuild')"))
+        counts[index] = conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+    return counts
+
+
+def match_expression(query: str) -> str:
+    """
+    Turns free text into an FTS5 query: every word must match, as a prefix.
+    - Words are quoted, so FTS5 operators and punctuation in `query` are inert.
+    - Returns an empty string when `query` has no searchable words.
+    """
+    return " ".join(f'"{term}"*' for term in _TERM.findall(query))
+
+
+# Ranked matches across both indexes; lower bm25 is better
+SEARCH_SQL = {
+    "group": (
+        "SELECT 'group' AS type, g.id AS id, g.id AS group_id, g.name AS title, g.description AS text, "
+        f"bm25(study_groups_fts, {COLUMN_WEIGHTS}) AS rank "
+        "FROM study_groups_fts JOIN study_groups g ON g.id = study_groups_fts.rowid "
+        "WHERE study_groups_fts MATCH :query"
+    ),
+    "resource": (
+        "SELECT 'resource' AS type, r.id AS id, r.group_id AS group_id, r.title AS title, r.url AS text, "
+        f"bm25(resources_fts, {COLUMN_WEIGHTS}) AS rank "
+        "FROM resources_fts JOIN resources r ON r.id = resources_fts.rowid "
+        "WHERE resources_fts MATCH :query"
+    ),
+}
+
+
+def search_statement(types) -> text:
+    """Builds the ranked, paged search over the given result `types`."""
+    union = " UNION ALL ".join(SEARCH_SQL[kind] for kind in types)
+    return text(f"{union} ORDER BY rank, type, id LIMIT :limit OFFSET :offset")
@@ -1,26 +1,42 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from fastapi import HTTPException, Depends, Security
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-import models, database
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models
 from database import get_db
 from config import settings  # Import settings properly
-
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from core.cache import TTLCache
 
 # OAuth2 token authentication scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# Hash password
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+@dataclass(frozen=True)
+class Principal:
+    """Snapshot of an authenticated user, safe to share across requests."""
+    id: int
+    name: str
+    email: str
+    role: str
+
+# Authenticated principals keyed by token subject (email)
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
 
-# Verify password
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+# Bumped by every invalidation; a lookup that overlapped one does not fill the cache
+_principal_generation = 0
+
+def invalidate_principal(*emails: str):
+    """
+    Drops cached principals so role changes and deletions apply immediately.
+    - Must be called once the write to a user's email, role or existence has
+      committed; lookups that read the user before the commit are not cached.
+    """
+    global _principal_generation
+    _principal_generation += 1
+    for email in emails:
+        principal_cache.pop(email)
 
 # Create JWT Token
 def create_access_token(data: dict, expires_delta: timedelta):
@@ -31,8 +47,11 @@ def create_access_token(data: dict, expires_delta: timedelta):
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)  
 
 # Decode JWT and Get Current User
-def get_current_user(token: str = Security(oauth2_scheme), db: Session = Depends(get_db)):
-    """Extracts user details from the JWT token and returns the authenticated user."""
+async def get_current_user(token: str = Security(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    """
+    Extracts user details from the JWT token and returns the authenticated user.
+    - Principals are cached per subject for `PRINCIPAL_CACHE_TTL_SECONDS`.
+    """
     credentials_exception = HTTPException(status_code=401, detail="Could not validate credentials")
 
     try:
@@ -43,11 +62,20 @@ def get_current_user(token: str = Security(oauth2_scheme), db: Session = Depends
         if email is None or role is None:
             raise credentials_exception
 
-        user = db.query(models.User).filter(models.User.email == email).first()
+        principal = principal_cache.get(email)
+        if principal is not None:
+            return principal
+
+        generation = _principal_generation
+        user = await db.scalar(select(models.User).where(models.User.email == email))
         if user is None:
             raise credentials_exception
 
-        return user
+        principal = Principal(id=user.id, name=user.name, email=user.email, role=user.role)
+        # The row may predate a commit whose invalidation ran during the query
+        if generation == _principal_generation:
+            principal_cache.set(email, principal)
+        return principal
 
     except JWTError:
         raise credentials_exception
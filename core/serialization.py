@@ -0,0 +1,54 @@
+from functools import lru_cache
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+
+class RowEncoder:
+    """
+    Encodes rows selected as plain column tuples straight to JSON bytes.
+    - `columns(model)` gives the select list matching the schema's fields, so
+      no ORM objects are built and nothing is validated `from_attributes`.
+    - Uses orjson when it is installed; otherwise a precompiled `TypeAdapter`
+      for `list[schema]`.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.fields = tuple(schema.model_fields)
+        self.id_index = self.fields.index("id")
+        self._adapter = TypeAdapter(list[schema])
+
+    def columns(self, model) -> list:
+        return [getattr(model, field) for field in self.fields]
+
+    def _dicts(self, rows) -> list:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def encode(self, rows) -> bytes:
+        """Encodes `rows` as a JSON array."""
+        if orjson is not None:
+            return orjson.dumps(self._dicts(rows))
+        return self._adapter.dump_json(self._adapter.validate_python(self._dicts(rows)))
+
+    def encode_items(self, rows) -> list:
+        """Encodes each row as its own JSON object (for NDJSON and chunked arrays)."""
+        if orjson is not None:
+            return [orjson.dumps(item) for item in self._dicts(rows)]
+        return [self.schema.model_validate(item).model_dump_json().encode() for item in self._dicts(rows)]
+
+
+@lru_cache(maxsize=None)
+def adapter_for(response_type) -> TypeAdapter:
+    """Returns the shared `TypeAdapter` for `response_type`, building it on first use."""
+    return TypeAdapter(response_type)
+
+
+@lru_cache(maxsize=None)
+def encoder_for(schema) -> RowEncoder:
+    """Returns the shared encoder for `schema`, building it on first use."""
+    return RowEncoder(schema)
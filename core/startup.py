@@ -0,0 +1,31 @@
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Wall-clock time of each named import and init phase, in the order they ran."""
+
+    def __init__(self):
+        self.phases = []
+
+    def add(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def as_dict(self) -> dict:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.phases}
+
+    def log(self):
+        total = sum(seconds for _, seconds in self.phases)
+        details = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.phases)
+        logger.info("Startup took %.1fms: %s", total * 1000, details)
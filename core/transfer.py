@@ -0,0 +1,272 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+import models, schemas
+from config import settings
+from core.bulk import existing_ids
+from core.hashing import password_hasher
+from core.serialization import encoder_for
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Exportable table -> (model, schema giving the exported columns)
+EXPORTS = {
+    "users": (models.User, schemas.UserExport),
+    "groups": (models.StudyGroup, schemas.StudyGroupExport),
+    "members": (models.GroupMember, schemas.GroupMemberResponse),
+    "sessions": (models.StudySession, schemas.StudySessionResponse),
+    "resources": (models.Resource, schemas.ResourceResponse),
+}
+
+# Importable table -> schema each row is validated with
+IMPORTS = {
+    "users": schemas.UserCreate,
+    "groups": schemas.StudyGroupCreate,
+    "members": schemas.GroupMemberImport,
+}
+
+
+# Export
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def export_rows(db, kind: str, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Streams every row of `kind` in id order as CSV (with a header) or NDJSON.
+    - Rows come from a server-side cursor `STREAM_YIELD_PER` at a time, so
+      memory stays flat regardless of table size.
+    """
+    model, schema = EXPORTS[kind]
+    encoder = encoder_for(schema)
+    stmt = select(*encoder.columns(model)).order_by(model.id)
+    result = await db.stream(stmt.execution_options(yield_per=settings.STREAM_YIELD_PER))
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(encoder.fields)
+        async for rows in result.partitions():
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    else:
+        async for rows in result.partitions():
+            yield b"\n".join(encoder.encode_items(rows)) + b"\n"
+
+
+# Import
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a byte stream into decoded lines without holding more than one line in memory."""
+    pending = b""
+    first = True
+    async for chunk in chunks:
+        if first:
+            chunk, first = chunk.removeprefix(b"\xef\xbb\xbf"), False  # UTF-8 BOM written by spreadsheets
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8", errors="replace")
+    if pending.strip():
+        yield pending.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple]:
+    """
+    Yields `(row number, dict or error message)` for every data row.
+    - CSV takes column names from its first line; empty cells are left out so
+      schema defaults apply. A quoted cell may span several lines.
+    - NDJSON expects one JSON object per line; blank lines are skipped.
+    """
+    row = 0
+    if fmt == "ndjson":
+        async for line in lines:
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield row, f"Invalid JSON: {exc}"
+                continue
+            yield row, record if isinstance(record, dict) else "Expected a JSON object"
+        return
+
+    header = None
+    pending = ""
+    async for line in lines:
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue  # inside a quoted cell
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) > len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}
+    if pending:
+        yield row + 1, "Unterminated quoted cell"
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    )
+
+
+class ImportReport:
+    """Counts created and failed rows; keeps the first `max_errors` row errors."""
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(schemas.ImportRowError(row=row, error=error))
+
+    def response(self) -> schemas.ImportResponse:
+        return schemas.ImportResponse(
+            created=self.created, failed=self.failed, errors=sorted(self.errors, key=lambda error: error.row),
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+
+async def _insert_users(db, chunk: list, report: ImportReport):
+    emails = {item.email for _, item in chunk}
+    taken = set((await db.scalars(select(models.User.email).where(models.User.email.in_(emails)))).all())
+    fresh = []
+    for row, item in chunk:
+        if item.email in taken:
+            report.fail(row, "Email already registered")
+        else:
+            taken.add(item.email)
+            fresh.append((row, item))
+    if not fresh:
+        return
+    hashes = await password_hasher.hash_many([item.password for _, item in fresh])
+    values = [
+        {"name": item.name, "email": item.email, "password": hashed, "role": (item.role or schemas.UserRole.user).value}
+        for (_, item), hashed in zip(fresh, hashes)
+    ]
+    inserted = set((await db.scalars(
+        insert(models.User).on_conflict_do_nothing(index_elements=["email"]).returning(models.User.email), values,
+    )).all())
+    for row, item in fresh:
+        if item.email in inserted:
+            report.created += 1
+        else:
+            report.fail(row, "Email already registered")
+
+
+async def _insert_groups(db, chunk: list, report: ImportReport):
+    await db.execute(insert(models.StudyGroup), [item.model_dump() for _, item in chunk])
+    report.created += len(chunk)
+
+
+async def _insert_members(db, chunk: list, report: ImportReport):
+    emails = {item.email for _, item in chunk if item.email is not None}
+    user_ids = dict((await db.execute(
+        select(models.User.email, models.User.id).where(models.User.email.in_(emails))
+    )).all()) if emails else {}
+    users = await existing_ids(db, models.User.id, (item.user_id for _, item in chunk if item.user_id is not None))
+    groups = await existing_ids(db, models.StudyGroup.id, (item.group_id for _, item in chunk))
+
+    values = {}
+    for row, item in chunk:
+        user_id = item.user_id if item.email is None else user_ids.get(item.email)
+        if user_id is None or (item.email is None and user_id not in users):
+            report.fail(row, "User not found")
+        elif item.group_id not in groups:
+            report.fail(row, "Study group not found")
+        elif user_id in values:
+            report.fail(row, "User can only join one study group.")
+        else:
+            values[user_id] = (row, {"user_id": user_id, "group_id": item.group_id})
+    if not values:
+        return
+    inserted = set((await db.scalars(
+        insert(models.GroupMember).on_conflict_do_nothing(index_elements=["user_id"]).returning(models.GroupMember.user_id),
+        [value for _, value in values.values()],
+    )).all())
+    for user_id, (row, _) in values.items():
+        if user_id in inserted:
+            report.created += 1
+        else:
+            report.fail(row, "User can only join one study group.")
+
+
+_INSERTERS = {
+    "users": _insert_users,
+    "groups": _insert_groups,
+    "members": _insert_members,
+}
+
+
+async def import_records(session_factory, kind: str, records: AsyncIterator[tuple],
+                         chunk_size: Optional[int] = None, max_errors: Optional[int] = None) -> schemas.ImportResponse:
+    """
+    Validates `records` (from `iter_records`) and inserts them `chunk_size`
+    rows per transaction.
+    - Invalid rows are reported with their row number and skipped; a chunk
+      only holds rows that passed validation.
+    - User passwords of a chunk are hashed in parallel on the password
+      hasher's process pool before the chunk is inserted.
+    - Memory is bounded by one chunk plus `max_errors` error entries.
+    """
+    schema = IMPORTS[kind]
+    insert_chunk = _INSERTERS[kind]
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    report = ImportReport(settings.IMPORT_MAX_ERRORS if max_errors is None else max_errors)
+
+    async def flush(chunk: list):
+        async with session_factory() as db:
+            await insert_chunk(db, chunk, report)
+            await db.commit()
+
+    chunk = []
+    async for row, record in records:
+        if isinstance(record, str):
+            report.fail(row, record)
+            continue
+        try:
+            chunk.append((row, schema.model_validate(record)))
+        except ValidationError as exc:
+            report.fail(row, _error_message(exc))
+            continue
+        if len(chunk) >= chunk_size:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    return report.response()
@@ -1,17 +1,198 @@
-from sqlalchemy import create_engine
+import asyncio
+from functools import cached_property
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
-from models import User, Base  # Import Base for table creation
+from models import User
+from config import Settings, settings
+from core.metrics import instrument_engine
+from core.replicas import ReplicaRouter, RoutingSession
 
-DATABASE_URL = "sqlite:///./study_group.db"
 
-# Create Engine
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def _is_file_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
 
-# Create Session Factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Ensure tables are created
-Base.metadata.create_all(bind=engine)
+def _async_url(url):
+    """Maps a sync SQLite URL onto the aiosqlite driver."""
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _read_only_url(url):
+    """Opens the same SQLite file through a `mode=ro` URI so readers can never take the write lock."""
+    return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"})
+
+
+def _pool_options(url, pool_size: int, config: Settings) -> dict:
+    if not _is_file_sqlite(url):
+        return {}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _apply_sqlite_pragmas(sync_engine, config: Settings, read_only: bool = False):
+    """
+    Configures every new SQLite connection from `config.Settings`.
+    - Read-only connections skip the pragmas that would write to the file.
+    """
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {config.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size = {config.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size = {config.SQLITE_MMAP_SIZE}",
+        f"PRAGMA foreign_keys = {'ON' if config.SQLITE_FOREIGN_KEYS else 'OFF'}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # Only takes effect on a file that has no tables yet
+        pragmas.append(f"PRAGMA auto_vacuum = {config.SQLITE_AUTO_VACUUM}")
+        pragmas.append(f"PRAGMA journal_mode = {config.SQLITE_JOURNAL_MODE}")
+        pragmas.append(f"PRAGMA synchronous = {config.SQLITE_SYNCHRONOUS}")
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+class Database:
+    """
+    Engines and session factories for one `Settings`.
+    - Each engine is built on first use, so importing the app never connects
+      or parses the URL; `create_app` warms the pools from its lifespan.
+    - Schema creation is left to `migrations` (see `RUN_MIGRATIONS_ON_STARTUP`).
+    - Reads go to `DB_READ_REPLICA_URLS` when set, otherwise to a read-only
+      engine on the primary SQLite file; writes always go to the primary.
+    """
+
+    def __init__(self, config: Settings):
+        self.config = config
+        self.url = make_url(config.DATABASE_URL)
+
+    def _prepare(self, sync_engine, read_only: bool = False):
+        _apply_sqlite_pragmas(sync_engine, self.config, read_only=read_only)
+        if self.config.METRICS_ENABLED:
+            instrument_engine(sync_engine)
+
+    # Sync engine (used by scripts and benchmarks)
+    @cached_property
+    def engine(self):
+        engine = create_engine(
+            self.url, connect_args={"check_same_thread": False},
+            **_pool_options(self.url, self.config.DB_POOL_SIZE, self.config),
+        )
+        self._prepare(engine)
+        return engine
+
+    @cached_property
+    def SessionLocal(self):
+        return sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+    # Async engine (used by the API routes)
+    @cached_property
+    def async_engine(self):
+        engine = create_async_engine(
+            _async_url(self.url), **_pool_options(self.url, self.config.DB_POOL_SIZE, self.config)
+        )
+        self._prepare(engine.sync_engine)
+        return engine
+
+    @cached_property
+    def AsyncSessionLocal(self):
+        return async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+
+    def _read_only_engine(self, url):
+        if not _is_file_sqlite(url):
+            engine = create_async_engine(_async_url(url))
+            self._prepare(engine.sync_engine)
+            return engine
+        engine = create_async_engine(
+            _read_only_url(_async_url(url)), **_pool_options(url, self.config.DB_READ_POOL_SIZE, self.config)
+        )
+        self._prepare(engine.sync_engine, read_only=True)
+        return engine
+
+    # Read engines (used by GET routes): the replicas, or a read-only view of the primary
+    @cached_property
+    def read_engines(self) -> list:
+        if self.config.DB_READ_REPLICA_URLS:
+            return [self._read_only_engine(make_url(url)) for url in self.config.DB_READ_REPLICA_URLS]
+        if _is_file_sqlite(self.url):
+            return [self._read_only_engine(self.url)]
+        return []
+
+    @property
+    def read_engine(self):
+        return self.read_engines[0] if self.read_engines else self.async_engine
+
+    @cached_property
+    def router(self) -> ReplicaRouter:
+        return ReplicaRouter(self.async_engine, self.read_engines, timeout=self.config.DB_REPLICA_CHECK_TIMEOUT)
+
+    @cached_property
+    def ReadSessionLocal(self):
+        return async_sessionmaker(
+            sync_session_class=RoutingSession, info={"router": self.router},
+            autoflush=False, expire_on_commit=False,
+        )
+
+    async def warm_up(self) -> int:
+        """
+        Health-checks the read engines, then opens the persistent connections
+        of the primary and every healthy read pool up front; returns how many.
+        """
+        async def ping(engine):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        healthy = await self.router.check()
+        pools = [(self.async_engine, self.config.DB_POOL_SIZE)]
+        pools += [(engine, self.config.DB_READ_POOL_SIZE) for engine, ok in zip(self.read_engines, healthy) if ok]
+        pools = [(engine, size if _is_file_sqlite(engine.url) else 1) for engine, size in pools]
+        await asyncio.gather(*(ping(engine) for engine, size in pools for _ in range(size)))
+        return sum(size for _, size in pools)
+
+    async def dispose(self):
+        """Closes every engine that was built."""
+        for engine in self.__dict__.pop("read_engines", []):
+            await engine.dispose()
+        engine = self.__dict__.pop("async_engine", None)
+        if engine is not None:
+            await engine.dispose()
+        engine = self.__dict__.pop("engine", None)
+        if engine is not None:
+            engine.dispose()
+        for name in ("SessionLocal", "AsyncSessionLocal", "ReadSessionLocal", "router"):
+            self.__dict__.pop(name, None)
+
+
+# Engines for `config.settings`; one set per process
+current = Database(settings)
+
+_LAZY_NAMES = ("engine", "SessionLocal", "async_engine", "AsyncSessionLocal", "read_engine", "ReadSessionLocal")
+
+
+def __getattr__(name):
+    # `database.engine`, `database.AsyncSessionLocal`, ... resolve lazily to the current engines
+    if name in _LAZY_NAMES:
+        return getattr(current, name)
+    if name == "DATABASE_URL":
+        return current.config.DATABASE_URL
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Fetch User by Email
 def get_user_by_email(db: Session, email: str):
@@ -20,8 +201,18 @@ def get_user_by_email(db: Session, email: str):
     return user
 
 # Dependency for DB session
-def get_db():
-    db = SessionLocal()
+async def get_db(request: Request):
+    """
+    Yields an async session for the current request.
+    - GET and HEAD requests get a session on the read-only engine.
+    """
+    session_factory = current.ReadSessionLocal if request.method in ("GET", "HEAD") else current.AsyncSessionLocal
+    async with session_factory() as db:
+        yield db
+
+# Dependency for a sync DB session (threadpool routes, scripts)
+def get_sync_db():
+    db = current.SessionLocal()
     try:
         yield db
     finally:
@@ -1,33 +1,122 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import timedelta
 from fastapi import FastAPI,Request,HTTPException
 from fastapi.responses import JSONResponse
-from models import Base
-from database import engine
-from routes import auth, users, groups, sessions, resources
+import database
+from routes import auth, users, groups, sessions, resources, search, changes, transfer, metrics
+from core.hashing import password_hasher
+from core.metrics import MetricsMiddleware
+from core.startup import StartupReport
+from core.counters import reconcile_periodically
+from core.changes import change_feed
+from core.reminders import reminder_scheduler
+from core.archive import archive_periodically
+from config import settings
+import migrations
+
+# Time spent importing the app and its dependencies
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+logger = logging.getLogger(__name__)
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the API from `config.settings`.
+    - One app per process: the engines (`database.current`), caches, rate
+      limiters and background services are module singletons built from the
+      same settings, so run separate processes for different settings.
+    - Engines are created lazily; the lifespan applies migrations (if enabled)
+      and warms the connection pools once, before the first request.
+    - The import and init time of each phase is logged and kept on
+      `app.state.startup`.
+    """
+    report = StartupReport()
+    report.add("import", IMPORT_SECONDS)
+    init_started = time.perf_counter()
+    db = database.current
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if settings.RUN_MIGRATIONS_ON_STARTUP or settings.CHECK_SCHEMA_ON_STARTUP:
+            async with db.async_engine.begin() as conn:
+                if settings.RUN_MIGRATIONS_ON_STARTUP:
+                    with report.phase("migrations"):
+                        await conn.run_sync(migrations.run_migrations)
+                if settings.CHECK_SCHEMA_ON_STARTUP:
+                    with report.phase("schema check"):
+                        await conn.run_sync(migrations.check_schema)
+        if settings.WARM_POOL_ON_STARTUP:
+            with report.phase("pool warm-up"):
+                await db.warm_up()
+        report.log()
+        background = []
+        if settings.DB_READ_REPLICA_URLS and settings.DB_REPLICA_CHECK_INTERVAL_SECONDS > 0:
+            background.append(asyncio.create_task(db.router.monitor(settings.DB_REPLICA_CHECK_INTERVAL_SECONDS)))
+        if settings.COUNTER_RECONCILE_INTERVAL_SECONDS > 0:
+            background.append(asyncio.create_task(
+                reconcile_periodically(db.async_engine, settings.COUNTER_RECONCILE_INTERVAL_SECONDS)
+            ))
+        if settings.SESSION_ARCHIVE_INTERVAL_SECONDS > 0:
+            background.append(asyncio.create_task(archive_periodically(
+                db.async_engine,
+                settings.SESSION_ARCHIVE_INTERVAL_SECONDS,
+                timedelta(days=settings.SESSION_ARCHIVE_AFTER_DAYS),
+                settings.SESSION_ARCHIVE_BATCH_SIZE,
+                settings.SESSION_ARCHIVE_BATCH_PAUSE_SECONDS,
+                settings.SQLITE_INCREMENTAL_VACUUM_PAGES,
+            )))
+        if settings.REMINDERS_ENABLED:
+            background.append(asyncio.create_task(reminder_scheduler.run()))
+        yield
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await change_feed.close()
+        password_hasher.shutdown()
+        await db.dispose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.startup = report
+
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_HEADER)
 
-Base.metadata.create_all(bind=engine)
+    # Include all routers
+    app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
+    app.include_router(users.router, prefix="/users", tags=["Users"])
+    app.include_router(groups.router, prefix="/groups", tags=["Groups"])
+    app.include_router(sessions.router, prefix="/sessions", tags=["Sessions"])
+    app.include_router(resources.router, prefix="/resources", tags=["Resources"])
+    app.include_router(search.router, prefix="/search", tags=["Search"])
+    app.include_router(changes.router, prefix="/changes", tags=["Changes"])
+    app.include_router(transfer.router, prefix="/data", tags=["Import/Export"])
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router, tags=["Metrics"])
 
-app = FastAPI()
+    # Root route to check if API is running
+    @app.get("/")
+    def read_root():
+        return {"message": "API is running!"}
 
-# Include all routers
-app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-app.include_router(users.router, prefix="/users", tags=["Users"])
-app.include_router(groups.router, prefix="/groups", tags=["Groups"])
-app.include_router(sessions.router, prefix="/sessions", tags=["Sessions"])
-app.include_router(resources.router, prefix="/resources", tags=["Resources"])
+    @app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
+    async def catch_all(full_path: str):
+        raise HTTPException(status_code=404, detail="This endpoint does not exist")
 
-# Root route to check if API is running
-@app.get("/")
-def read_root():
-    return {"message": "API is running!"}
+    @app.exception_handler(Exception)
+    async def global_exception_handler(request: Request, exc: Exception):
+        return JSONResponse(
+            status_code=500,
+            content={"error": "An internal error occurred", "details": str(exc)},
+        )
 
-@app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
-async def catch_all(full_path: str):
-    raise HTTPException(status_code=404, detail="This endpoint does not exist")
+    report.add("create_app", time.perf_counter() - init_started)
+    return app
 
 
-@app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
-        status_code=500,
-        content={"error": "An internal error occurred", "details": str(exc)},
-    )
\ No newline at end of file
+app = create_app()
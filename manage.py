@@ -0,0 +1,237 @@
+"""
+Maintenance commands for the Study Group API.
+
+Usage:
+    python manage.py migrate
+    python manage.py check-schema
+    python manage.py rebuild-search
+    python manage.py reconcile-counters
+    python manage.py prune-changes [--days 30]
+    python manage.py archive-sessions [--days 365]
+    python manage.py vacuum
+    python manage.py import users roster.csv
+    python manage.py export members --format csv --output members.csv
+    python manage.py snapshot-replica replica1.db replica2.db
+    python manage.py startup-report
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+import database
+from database import engine, DATABASE_URL
+import migrations
+from core.search import rebuild_search_index
+from core.counters import reconcile_counters
+from core.changes import prune_changes
+from core.archive import archive_sessions, incremental_vacuum
+from core.hashing import password_hasher
+from core.transfer import EXPORTS, IMPORTS, export_rows, import_records, iter_lines, iter_records
+from config import settings
+
+
+def migrate(args):
+    with engine.begin() as conn:
+        applied = migrations.run_migrations(conn)
+    print(f"Applied migrations: {applied}" if applied else "Database is up to date.")
+
+
+def check_schema(args):
+    with engine.connect() as conn:
+        report = migrations.check_schema(conn)
+    print(json.dumps(report, indent=2))
+    if any(report.values()):
+        raise SystemExit(1)
+
+
+def rebuild_search(args):
+    with engine.begin() as conn:
+        counts = rebuild_search_index(conn)
+    for index, rows in counts.items():
+        print(f"{index}: {rows} rows indexed")
+
+
+def reconcile(args):
+    with engine.begin() as conn:
+        repaired = reconcile_counters(conn)
+    for counter, groups in repaired.items():
+        print(f"{counter}: {groups} groups repaired")
+
+
+def prune(args):
+    with engine.begin() as conn:
+        removed = prune_changes(conn, args.days)
+    print(f"Removed {removed} change log entries older than {args.days} days")
+
+
+def archive(args):
+    async def run():
+        try:
+            return await archive_sessions(
+                database.async_engine, datetime.utcnow() - timedelta(days=args.days), args.batch_size,
+                settings.SESSION_ARCHIVE_BATCH_PAUSE_SECONDS, settings.SQLITE_INCREMENTAL_VACUUM_PAGES,
+            )
+        finally:
+            await database.current.dispose()
+
+    print(f"Archived {asyncio.run(run())} sessions scheduled more than {args.days} days ago")
+
+
+def vacuum(args):
+    # VACUUM cannot run inside a transaction; it also applies a changed auto_vacuum mode
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        mode = conn.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+        if mode != 2 or args.full:
+            print("Rebuilding the file with a full VACUUM (blocks writers until it finishes)...")
+            conn.exec_driver_sql(f"PRAGMA auto_vacuum = {settings.SQLITE_AUTO_VACUUM}")
+            conn.exec_driver_sql("VACUUM")
+        free = incremental_vacuum(conn, args.pages)
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    print(f"Free pages left: {free}")
+
+
+async def _file_chunks(path: str):
+    with open(path, "rb") as handle:
+        while chunk := handle.read(64 * 1024):
+            yield chunk
+
+
+def _format(args) -> str:
+    if args.format:
+        return args.format
+    return "csv" if (args.file or args.output or "").endswith(".csv") else "ndjson"
+
+
+def import_data(args):
+    async def run():
+        try:
+            records = iter_records(iter_lines(_file_chunks(args.file)), _format(args))
+            return await import_records(database.AsyncSessionLocal, args.kind, records)
+        finally:
+            await database.current.dispose()
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        password_hasher.shutdown()
+    print(report.model_dump_json(indent=2))
+    if report.failed:
+        raise SystemExit(1)
+
+
+def export_data(args):
+    async def run(out):
+        try:
+            async with database.AsyncSessionLocal() as db:
+                async for chunk in export_rows(db, args.kind, _format(args)):
+                    out.write(chunk)
+        finally:
+            await database.current.dispose()
+
+    if args.output:
+        with open(args.output, "wb") as out:
+            asyncio.run(run(out))
+    else:
+        asyncio.run(run(sys.stdout.buffer))
+
+
+def snapshot_replica(args):
+    # sqlite3's online backup copies a consistent snapshot while the app keeps writing
+    source = sqlite3.connect(engine.url.database)
+    for path in args.paths:
+        target = sqlite3.connect(path)
+        with target:
+            source.backup(target)
+        target.close()
+        print(f"Copied {DATABASE_URL} to {path}")
+    source.close()
+
+
+# Imports the app and runs its lifespan in a fresh interpreter, then prints the phase timings
+_STARTUP_PROBE = """
+import asyncio, json, main
+async def start():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+asyncio.run(start())
+print(json.dumps(main.app.state.startup.as_dict()))
+"""
+
+# Top-level modules of this app; everything else is a dependency
+_APP_MODULES = ("main", "config", "database", "models", "schemas", "migrations", "base")
+
+
+def startup_report(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _STARTUP_PROBE], capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+
+    # `-X importtime` lines: "import time: <self us> | <cumulative us> | <indented module>"
+    print("Import (cumulative, includes dependencies first imported by the module):")
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        if module.split(".")[0] in _APP_MODULES or module.startswith(("core.", "routes.")):
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            print(f"  {'  ' * depth}{module:<{32 - 2 * depth}}{int(cumulative) / 1000:>9.1f}ms")
+
+    print("Phases:")
+    for phase, ms in json.loads(result.stdout.strip().splitlines()[-1]).items():
+        print(f"  {phase:<32}{ms:>9.1f}ms")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("migrate", help="Apply pending schema migrations").set_defaults(func=migrate)
+    commands.add_parser("check-schema", help="Report missing indexes and full table scans").set_defaults(func=check_schema)
+    commands.add_parser("rebuild-search", help="Re-index groups and resources for /search").set_defaults(func=rebuild_search)
+    commands.add_parser("reconcile-counters", help="Recompute member/session/resource counts of every group").set_defaults(func=reconcile)
+    pruning = commands.add_parser("prune-changes", help="Delete old change log entries behind /changes")
+    pruning.add_argument("--days", type=float, default=settings.CHANGE_LOG_RETENTION_DAYS, help="Keep entries this recent")
+    pruning.set_defaults(func=prune)
+    archiving = commands.add_parser("archive-sessions", help="Move past sessions to study_sessions_archive in batches")
+    archiving.add_argument("--days", type=float, default=settings.SESSION_ARCHIVE_AFTER_DAYS, help="Archive sessions older than this")
+    archiving.add_argument("--batch-size", type=int, default=settings.SESSION_ARCHIVE_BATCH_SIZE)
+    archiving.set_defaults(func=archive)
+    vacuuming = commands.add_parser("vacuum", help="Return free pages to the OS (converts the file to incremental auto_vacuum once)")
+    vacuuming.add_argument("--pages", type=int, default=0, help="Free pages to release; 0 releases all of them")
+    vacuuming.add_argument("--full", action="store_true", help="Rebuild the whole file even if it is already incremental")
+    vacuuming.set_defaults(func=vacuum)
+    importing = commands.add_parser("import", help="Load users, groups or memberships from a CSV or NDJSON file")
+    importing.add_argument("kind", choices=sorted(IMPORTS))
+    importing.add_argument("file", help="CSV with a header line, or NDJSON")
+    importing.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to csv for *.csv files, else ndjson")
+    importing.set_defaults(func=import_data, output=None)
+    exporting = commands.add_parser("export", help="Write a table as CSV or NDJSON")
+    exporting.add_argument("kind", choices=sorted(EXPORTS))
+    exporting.add_argument("--output", help="File to write; defaults to stdout")
+    exporting.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to csv for *.csv files, else ndjson")
+    exporting.set_defaults(func=export_data, file=None)
+    snapshot = commands.add_parser("snapshot-replica", help="Copy the primary SQLite file to local read replicas")
+    snapshot.add_argument("paths", nargs="+", help="Replica files to create or overwrite")
+    snapshot.set_defaults(func=snapshot_replica)
+    commands.add_parser("startup-report", help="Time the app's imports and startup phases").set_defaults(func=startup_report)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import logging
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from models import ArchivedStudySession, Base, ChangeLog, StudySession
+from core.search import create_search_tables, rebuild_search_index
+from core.counters import GROUP_COUNTERS, create_counter_triggers, reconcile_counters
+from core.changes import create_change_triggers
+
+logger = logging.getLogger(__name__)
+
+# Registered migrations as (version, description, function), applied in version order
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    """Registers a schema migration. Each one must be safe to run on databases created by `create_all`."""
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return register
+
+
+@migration(1, "baseline schema")
+def _baseline(conn: Connection):
+    Base.metadata.create_all(bind=conn)
+
+
+@migration(2, "indexes for hot lookups")
+def _hot_lookup_indexes(conn: Connection):
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email ON users (email)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_group_members_user_id ON group_members (user_id)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_study_sessions_group_id_scheduled_time "
+        "ON study_sessions (group_id, scheduled_time)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_resources_group_id ON resources (group_id)"))
+
+
+@migration(3, "index group_members(group_id) for group deletes")
+def _group_members_group_index(conn: Connection):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_group_members_group_id ON group_members (group_id)"))
+
+
+@migration(4, "FTS5 search over groups and resources")
+def _search_indexes(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        logger.warning("Full-text search needs SQLite FTS5; skipping search indexes on %s", conn.dialect.name)
+        return
+    create_search_tables(conn)
+    rebuild_search_index(conn)
+
+
+@migration(5, "member, session and resource counters on study_groups")
+def _group_counters(conn: Connection):
+    ArchivedStudySession.__table__.create(bind=conn, checkfirst=True)  # archived sessions are counted too
+    existing = {column["name"] for column in inspect(conn).get_columns("study_groups")}
+    for counter in GROUP_COUNTERS:
+        if counter not in existing:
+            conn.execute(text(f"ALTER TABLE study_groups ADD COLUMN {counter} INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_study_groups_member_count ON study_groups (member_count, id)"))
+    if conn.dialect.name != "sqlite":
+        logger.warning("Group counter triggers are SQLite-only; run reconcile-counters to refresh them on %s", conn.dialect.name)
+    else:
+        create_counter_triggers(conn)
+    reconcile_counters(conn)
+
+
+@migration(6, "one study group per user: unique group_members(user_id)")
+def _unique_membership(conn: Connection):
+    # Keep each user's earliest membership; the counter triggers adjust member_count
+    removed = conn.execute(text(
+        "DELETE FROM group_members WHERE user_id IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM group_members WHERE user_id IS NOT NULL GROUP BY user_id)"
+    )).rowcount
+    if removed:
+        logger.warning("Removed %s duplicate group memberships", removed)
+    conn.execute(text("DROP INDEX IF EXISTS ix_group_members_user_id"))
+    conn.execute(text("CREATE UNIQUE INDEX ix_group_members_user_id ON group_members (user_id)"))
+
+
+@migration(7, "change log for sessions and resources")
+def _change_log(conn: Connection):
+    ChangeLog.__table__.create(bind=conn, checkfirst=True)
+    if conn.dialect.name != "sqlite":
+        logger.warning("Change log triggers are SQLite-only; /changes will stay empty on %s", conn.dialect.name)
+        return
+    create_change_triggers(conn)
+
+
+@migration(8, "index study_sessions(scheduled_time) for reminders")
+def _sessions_scheduled_time_index(conn: Connection):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_study_sessions_scheduled_time ON study_sessions (scheduled_time)"))
+
+
+@migration(9, "archive table for past study sessions")
+def _session_archive(conn: Connection):
+    ArchivedStudySession.__table__.create(bind=conn, checkfirst=True)
+
+
+@migration(10, "archiving a session is not a delete for counters and the change log")
+def _archive_aware_triggers(conn: Connection):
+    if conn.dialect.name == "sqlite":
+        # Recreated with a guard that skips sessions just copied into the archive
+        conn.execute(text("DROP TRIGGER IF EXISTS study_sessions_session_count_delete"))
+        conn.execute(text("DROP TRIGGER IF EXISTS study_sessions_change_delete"))
+        create_counter_triggers(conn)
+        create_change_triggers(conn)
+    # Sessions archived so far were subtracted from session_count
+    reconcile_counters(conn)
+
+
+@migration(11, "never reuse study session ids: AUTOINCREMENT on study_sessions")
+def _session_autoincrement(conn: Connection):
+    if conn.dialect.name != "sqlite":
+        return
+    sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'study_sessions'")).scalar()
+    if "AUTOINCREMENT" not in sql.upper():
+        # Rebuilt in place: dropping the table also drops its indexes and triggers, which are recreated below
+        conn.execute(text("CREATE TEMP TABLE study_sessions_copy AS SELECT id, group_id, scheduled_time FROM study_sessions"))
+        conn.execute(text("DROP TABLE study_sessions"))
+        StudySession.__table__.create(bind=conn)
+        orphans = conn.execute(text(
+            "DELETE FROM study_sessions_copy WHERE group_id IS NOT NULL "
+            "AND group_id NOT IN (SELECT id FROM study_groups)"
+        )).rowcount
+        if orphans:
+            logger.warning("Dropped %s study sessions of deleted groups", orphans)
+        conn.execute(text(
+            "INSERT INTO study_sessions (id, group_id, scheduled_time) "
+            "SELECT id, group_id, scheduled_time FROM study_sessions_copy ORDER BY id"
+        ))
+        conn.execute(text("DROP TABLE study_sessions_copy"))
+        create_counter_triggers(conn)
+        create_change_triggers(conn)
+    # Start after every id handed out so far: live, archived, or only left in the change log
+    conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'study_sessions'"))
+    conn.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'study_sessions', COALESCE(MAX(id), 0) FROM ("
+        "SELECT MAX(id) AS id FROM study_sessions UNION ALL SELECT MAX(id) FROM study_sessions_archive "
+        "UNION ALL SELECT MAX(entity_id) FROM change_log WHERE entity = 'session')"
+    ))
+    reconcile_counters(conn)
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+
+
+def applied_versions(conn: Connection) -> set:
+    _ensure_version_table(conn)
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(conn: Connection) -> list:
+    """
+    Applies every pending migration inside the caller's transaction.
+    - Returns the versions that were applied.
+    """
+    done = applied_versions(conn)
+    applied = []
+    for version, description, func in MIGRATIONS:
+        if version in done:
+            continue
+        logger.info("Applying migration %s: %s", version, description)
+        func(conn)
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+            {"v": version, "d": description, "t": datetime.utcnow()},
+        )
+        applied.append(version)
+    return applied
+
+
+# Queries on the hot path; each must be answered without a full table scan
+HOT_QUERIES = {
+    "user by email": "SELECT * FROM users WHERE email = :value",
+    "membership by user": "SELECT * FROM group_members WHERE user_id = :value",
+    "members by group": "SELECT * FROM group_members WHERE group_id = :value",
+    "sessions by group": "SELECT * FROM study_sessions WHERE group_id = :value ORDER BY scheduled_time",
+    "resources by group": "SELECT * FROM resources WHERE group_id = :value",
+    "popular groups": "SELECT * FROM study_groups ORDER BY member_count DESC, id DESC LIMIT 100",
+    "sessions starting soon": "SELECT id, group_id, scheduled_time FROM study_sessions WHERE scheduled_time > :value ORDER BY scheduled_time",
+}
+
+
+def missing_indexes(conn: Connection) -> list:
+    """Lists indexes declared on the models that do not exist in the database."""
+    inspector = inspect(conn)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            missing.append(f"table {table.name}")
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(f"{table.name}.{index.name}" for index in table.indexes if index.name not in existing)
+    return missing
+
+
+def full_scans(conn: Connection) -> list:
+    """Runs `EXPLAIN QUERY PLAN` on `HOT_QUERIES` and returns the ones that scan a whole table."""
+    if conn.dialect.name != "sqlite":
+        return []
+    flagged = []
+    for name, sql in HOT_QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), {"value": 0}).all()
+        scans = [row[-1] for row in plan if row[-1].startswith("SCAN ") and " INDEX " not in row[-1]]
+        if scans:
+            flagged.append(f"{name}: {'; '.join(scans)}")
+    return flagged
+
+
+def check_schema(conn: Connection) -> dict:
+    """Reports pending migrations, missing indexes and full table scans on hot queries."""
+    done = applied_versions(conn)
+    report = {
+        "pending_migrations": [version for version, _, _ in MIGRATIONS if version not in done],
+        "missing_indexes": missing_indexes(conn),
+        "full_scans": full_scans(conn),
+    }
+    for problem in report["missing_indexes"]:
+        logger.warning("Missing index: %s", problem)
+    for problem in report["full_scans"]:
+        logger.warning("Full table scan: %s", problem)
+    return report
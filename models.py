@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime,Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime,Enum, Index, func
 from sqlalchemy.orm import relationship
 from base import Base
 import datetime
@@ -16,36 +16,61 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    email = Column(String, unique=True, nullable=False)
+    email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
     role = Column(Enum(UserRole), default=UserRole.user)
    
 
-    groups = relationship("GroupMember", back_populates="user", cascade="all, delete")
+    # passive_deletes: rely on ON DELETE CASCADE instead of loading children
+    groups = relationship("GroupMember", back_populates="user", cascade="all, delete", passive_deletes=True)
 
 class StudyGroup(Base):
     __tablename__ = "study_groups"
+    __table_args__ = (
+        Index("ix_study_groups_member_count", "member_count", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String)
 
-    members = relationship("GroupMember", back_populates="group", cascade="all, delete")
-    sessions = relationship("StudySession", back_populates="group", cascade="all, delete")
-    resources = relationship("Resource", back_populates="group", cascade="all, delete")
+    # Maintained by triggers (see core/counters.py); never written by the app
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")
+    session_count = Column(Integer, nullable=False, default=0, server_default="0")
+    resource_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # passive_deletes: rely on ON DELETE CASCADE instead of loading children
+    members = relationship(
+        "GroupMember", back_populates="group", cascade="all, delete", passive_deletes=True,
+        order_by="GroupMember.id",
+    )
+    sessions = relationship(
+        "StudySession", back_populates="group", cascade="all, delete", passive_deletes=True,
+        order_by="(StudySession.scheduled_time, StudySession.id)",
+    )
+    resources = relationship(
+        "Resource", back_populates="group", cascade="all, delete", passive_deletes=True,
+        order_by="Resource.id",
+    )
 
 class GroupMember(Base):
     __tablename__ = "group_members"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"))
+    # Unique: a user can be in only one study group
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, index=True)
+    group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"), index=True)
 
     user = relationship("User", back_populates="groups")
     group = relationship("StudyGroup", back_populates="members")
 
 class StudySession(Base):  # ✅ Correct name
     __tablename__ = "study_sessions"
+    __table_args__ = (
+        Index("ix_study_sessions_group_id_scheduled_time", "group_id", "scheduled_time"),
+        Index("ix_study_sessions_scheduled_time", "scheduled_time"),
+        {"sqlite_autoincrement": True},  # archived ids must never be handed out again
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"))
@@ -53,12 +78,43 @@ class StudySession(Base):  # ✅ Correct name
     
     group = relationship("StudyGroup", back_populates="sessions")
 
+class ArchivedStudySession(Base):
+    """Past study sessions moved out of study_sessions by core/archive.py; ids are kept."""
+    __tablename__ = "study_sessions_archive"
+    __table_args__ = (
+        Index("ix_study_sessions_archive_group_id_scheduled_time", "group_id", "scheduled_time"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"))
+    scheduled_time = Column(DateTime)
+    archived_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
+
+# Table -> the archive its rows are moved to; triggers treat a move as neither a delete nor an insert
+ARCHIVE_TABLES = {"study_sessions": "study_sessions_archive"}
+
 class Resource(Base):
     __tablename__ = "resources"
 
     id = Column(Integer, primary_key=True, index=True)
-    group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"))
+    group_id = Column(Integer, ForeignKey("study_groups.id", ondelete="CASCADE"), index=True)
     title = Column(String, nullable=False)
     url = Column(String, nullable=False)
 
     group = relationship("StudyGroup", back_populates="resources")
+
+class ChangeLog(Base):
+    """Append-only log of session and resource changes, written by triggers (see core/changes.py)."""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_group_id_id", "group_id", "id"),
+        {"sqlite_autoincrement": True},  # ids are cursors; never reuse them after pruning
+    )
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # "session" or "resource"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # "insert", "update", "delete" or "archive"
+    group_id = Column(Integer)
+    data = Column(String)  # JSON snapshot of the row after the change; NULL for deletes
+    changed_at = Column(DateTime, nullable=False, server_default=func.current_timestamp())
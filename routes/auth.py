@@ -1,22 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import models, schemas
 from database import get_db
-from core.security import create_access_token, verify_password, hash_password, get_current_user
+from core.security import create_access_token
+from core.hashing import password_hasher
+from core.rate_limit import auth_rate_limit
 from config import settings
 
 
-router = APIRouter(tags=["Authentication"])
+# Every auth route is rate-limited by client IP and email before bcrypt runs
+router = APIRouter(tags=["Authentication"], dependencies=[Depends(auth_rate_limit)])
 
 @router.post("/register", response_model=schemas.UserResponse)
-def register_user(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register_user(user_data: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     """
     **Public Route**  
     - Allows **new users to register**.  
     - Default role is **user** unless specified.
     """
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+    existing_user = await db.scalar(select(models.User).where(models.User.email == user_data.email))
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -24,25 +28,25 @@ def register_user(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     new_user = models.User(
         name=user_data.name,
         email=user_data.email,
-        password=hash_password(user_data.password),  # ✅ Hash password
+        password=await password_hasher.hash(user_data.password),  # ✅ Hash password off the event loop
         role=user_data.role  # ✅ This now correctly uses default or provided value
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return new_user
 
 # User Login (Open Access)
 @router.post("/login", response_model=schemas.TokenResponse)
-def login_user(login_data: schemas.UserLogin, db: Session = Depends(get_db)):
+async def login_user(login_data: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
     """
     **Public Route**  
     - Users and admins can **log in** and receive a JWT token.
     """
-    user = db.query(models.User).filter(models.User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.password):
+    user = await db.scalar(select(models.User).where(models.User.email == login_data.email))
+    if not user or not await password_hasher.verify(login_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     access_token = create_access_token(
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas, database
+from database import get_db
+from config import settings
+from core.pagination import NEXT_CURSOR_HEADER
+from core.response_cache import response_cache
+from core.changes import change_feed, fetch_changes, oldest_change, sse_event
+
+router = APIRouter(tags=["Changes"])
+
+# Change log entity for each `type` filter
+CHANGE_TYPES = {
+    None: None,
+    "sessions": "session",
+    "resources": "resource",
+}
+
+
+class ChangeFilters:
+    """Query parameters shared by the delta endpoint and the stream."""
+
+    def __init__(
+        self,
+        since: Optional[int] = Query(None, ge=0, description="Return changes after this cursor (the id of the last change seen)."),
+        type: Optional[Literal["sessions", "resources"]] = Query(None, description="Only session or only resource changes."),
+        group_id: Optional[int] = Query(None, description="Only changes to this study group's sessions and resources."),
+    ):
+        self.since = since
+        self.entity = CHANGE_TYPES[type]
+        self.group_id = group_id
+
+
+async def check_cursor(db: AsyncSession, since: Optional[int]):
+    """Rejects a cursor whose following changes were already pruned from the log."""
+    if since is None:
+        return
+    oldest = await oldest_change(db)
+    if oldest is not None and since < oldest - 1:
+        raise HTTPException(
+            status_code=410,
+            detail="Changes after this cursor are no longer kept; reload the lists and start from the latest change.",
+        )
+
+
+# Changes to sessions and resources since a cursor
+@router.get("", response_model=list[schemas.ChangeResponse])
+async def get_changes(
+    request: Request,
+    filters: ChangeFilters = Depends(),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of changes to return."),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    **Public Access**  
+    Lists session and resource inserts, updates and deletes, oldest first.
+    - Pass the `id` of the last change you applied as `since` to get only newer ones.
+    - `data` holds the row after the change; it is null for deletes.
+    - `archive` marks a past session moved to the archive; it still exists
+      (see `include_archived` on the session routes), so keep it if you keep history.
+    - `X-Next-Cursor` is set when more changes are waiting.
+    - Returns 410 when the changes after `since` were pruned; reload the lists then.
+    """
+    page_size = limit or settings.PAGE_SIZE_DEFAULT
+
+    async def load(response: Response):
+        await check_cursor(db, filters.since)
+        changes = await fetch_changes(db, filters.since, page_size + 1, filters.entity, filters.group_id)
+        if len(changes) > page_size:
+            changes = changes[:page_size]
+            response.headers[NEXT_CURSOR_HEADER] = str(changes[-1]["id"])
+        return changes
+
+    return await response_cache.serve(request, ("sessions", "resources"), list[schemas.ChangeResponse], load)
+
+
+# Live change stream (Server-Sent Events)
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_changes(
+    filters: ChangeFilters = Depends(),
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource when it reconnects; takes precedence over `since`."),
+):
+    """
+    **Public Access**  
+    Streams session and resource changes as `text/event-stream` as they are committed.
+    - Each `change` event carries a change (as in `GET /changes`) and uses its `id` as the event id.
+    - With `since` (or `Last-Event-ID`), the changes after that cursor are sent first.
+    - A client that falls too far behind gets a `reset` event and is disconnected;
+      it should catch up from its last event id with `GET /changes`.
+    """
+    if last_event_id and last_event_id.isdigit():
+        filters.since = int(last_event_id)
+    async with database.ReadSessionLocal() as db:
+        await check_cursor(db, filters.since)
+    subscription = await change_feed.subscribe()
+
+    def wanted(change: dict) -> bool:
+        return (filters.entity is None or change["entity"] == filters.entity) and (
+            filters.group_id is None or change["group_id"] == filters.group_id
+        )
+
+    async def events():
+        cursor = filters.since
+        try:
+            yield b"retry: 3000\n\n"
+            # Catch up from the log; live events overlapping the replay are skipped below
+            while cursor is not None:
+                async with database.AsyncSessionLocal() as db:
+                    changes = await fetch_changes(db, cursor, settings.PAGE_SIZE_MAX, filters.entity, filters.group_id)
+                for change in changes:
+                    yield sse_event(change)
+                    cursor = change["id"]
+                if len(changes) < settings.PAGE_SIZE_MAX:
+                    break
+
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    yield b'event: reset\ndata: {"since": %d}\n\n' % (cursor or 0)
+                    return
+                try:
+                    item = await asyncio.wait_for(subscription.get(), settings.CHANGE_FEED_KEEPALIVE_SECONDS)
+                except TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                change, event = item
+                if cursor is not None and change["id"] <= cursor:
+                    continue
+                cursor = change["id"]
+                if wanted(change):
+                    yield event
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,115 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 import models, schemas
 from database import get_db
-from core.security import get_current_user
+from core.security import get_current_user, Principal
+from core.pagination import PageParams, paginate, paginate_json, stream_rows
+from core.bulk import existing_ids, insert_valid
+from core.response_cache import response_cache
+from core.changes import change_feed
+from core.idempotency import IDEMPOTENCY_HEADER, idempotency_cache
 
 router = APIRouter(tags=["Groups"])
 
 # Dependency to Check Admin Access
-def admin_required(current_user: models.User = Depends(get_current_user)):
+async def admin_required(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required.")
     return current_user
 
+# Relationships that can be embedded in group responses
+EXPANDABLE = ("members", "sessions", "resources")
+
+# Group payloads carry member/session/resource counters, so they change with every child write
+GROUP_COLLECTIONS = ("groups", *EXPANDABLE)
+
+# `sort` values of the group list -> (sort column, descending)
+GROUP_SORTS = {
+    "id": (None, False),
+    "popular": (models.StudyGroup.member_count, True),
+}
+
+def parse_expand(expand: Optional[str] = Query(None, description="Comma-separated relationships to embed: members, sessions, resources.")) -> tuple:
+    """Validates `?expand=` and returns the requested relationships in a fixed order."""
+    if not expand:
+        return ()
+    requested = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = requested.difference(EXPANDABLE)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot expand: {', '.join(sorted(unknown))}")
+    return tuple(name for name in EXPANDABLE if name in requested)
+
+def group_detail(group: models.StudyGroup, expand: tuple) -> dict:
+    """Builds a group payload with only the `expand`ed (already loaded) relationships."""
+    data = {
+        "id": group.id, "name": group.name, "description": group.description,
+        "member_count": group.member_count, "session_count": group.session_count,
+        "resource_count": group.resource_count,
+    }
+    for name in expand:
+        data[name] = getattr(group, name)
+    return data
+
 # User joins a study group (Only one group allowed)
 @router.post("/join-group", response_model=schemas.GroupMemberResponse)
-def join_study_group(
+async def join_study_group(
     group_member: schemas.GroupMemberCreate,
-    db: Session = Depends(get_db)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Allows any user to join a study group **without authentication**.
     - Users can **only join one group at a time**.
     - If they are already in a group, they **cannot join another**.
+    - Send an `Idempotency-Key` header to make retries safe: a retry with the
+      same key and body returns the original response.
     """
     # Ensure the user_id is provided in the request body
     if not group_member.user_id:
         raise HTTPException(status_code=400, detail="User ID is required.")
 
-    # Check if the user is already in a study group
-    existing_membership = db.query(models.GroupMember).filter(
-        models.GroupMember.user_id == group_member.user_id
-    ).first()
+    async def join():
+        # One statement: the unique index on user_id enforces the one-group rule, even under concurrent joins
+        stmt = (
+            insert(models.GroupMember)
+            .values(user_id=group_member.user_id, group_id=group_member.group_id)
+            .on_conflict_do_nothing(index_elements=[models.GroupMember.user_id])
+            .returning(models.GroupMember.id, models.GroupMember.user_id, models.GroupMember.group_id)
+        )
+        try:
+            new_membership = (await db.execute(stmt)).mappings().first()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=404, detail="User or study group not found.")
+
+        if new_membership is None:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="User can only join one study group.")
 
-    if existing_membership:
-        raise HTTPException(status_code=400, detail="User can only join one study group.")
+        await db.commit()
+        response_cache.bump("members")
+        return new_membership
+
+    if idempotency_key:
+        return await idempotency_cache.run(request, idempotency_key, schemas.GroupMemberResponse, join)
+    return await join()
+
+
+# Add many users to study groups in one transaction
+@router.post("/members/bulk", response_model=schemas.BulkResponse)
+async def join_study_groups_bulk(
+    memberships: schemas.GroupMemberBatch,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Adds up to `BULK_MAX_MEMBERS` memberships with a single commit.
+    - The one-group rule applies: users already in a group, or listed
+      twice in the batch, are reported and skipped.
+    - Items pointing at a missing user or group are reported and skipped.
+    - Returns 409 (adding nothing) if a listed user joined a group while
+      the batch was being checked; retrying reports them as above.
+    """
+    user_ids = [item.user_id for item in memberships]
+    users = await existing_ids(db, models.User.id, user_ids)
+    groups = await existing_ids(db, models.StudyGroup.id, (item.group_id for item in memberships))
+    members = await existing_ids(db, models.GroupMember.user_id, user_ids)
 
-    #Add the user to the group
-    new_membership = models.GroupMember(user_id=group_member.user_id, group_id=group_member.group_id)
-    db.add(new_membership)
-    db.commit()
-    db.refresh(new_membership)
+    errors = {}
+    seen = set()
+    for index, item in enumerate(memberships):
+        if item.user_id not in users:
+            errors[index] = "User not found"
+        elif item.group_id not in groups:
+            errors[index] = "Study group not found"
+        elif item.user_id in members or item.user_id in seen:
+            errors[index] = "User can only join one study group."
+        seen.add(item.user_id)
 
-    return new_membership
+    result = await insert_valid(db, models.GroupMember, [item.model_dump() for item in memberships], errors)
+    response_cache.bump("members")
+    return result
 
 
 #User leaves a study group
 @router.delete("/leave-group/{user_id}")
-def leave_group(user_id: int, db: Session = Depends(get_db)):
+async def leave_group(user_id: int, db: AsyncSession = Depends(get_db)):
     """
     Allows any user to leave their current study group without authentication.
     - If the user is not in a group, returns an error.
     """
-    group_member = db.query(models.GroupMember).filter(
+    group_member = await db.scalar(select(models.GroupMember).where(
         models.GroupMember.user_id == user_id
-    ).first()
+    ))
 
     if not group_member:
         raise HTTPException(status_code=404, detail="User is not in any study group.")
 
-    db.delete(group_member)
-    db.commit()
+    await db.delete(group_member)
+    await db.commit()
+    response_cache.bump("members")
     return {"message": "User removed from group successfully"}
 
 #Create a new group
 @router.post("/", response_model=schemas.StudyGroupResponse, dependencies=[Depends(admin_required)])
-def create_group(group: schemas.StudyGroupCreate, db: Session = Depends(get_db)):
+async def create_group(group: schemas.StudyGroupCreate, db: AsyncSession = Depends(get_db)):
     new_group = models.StudyGroup(name=group.name, description=group.description)
     db.add(new_group)
-    db.commit()
-    db.refresh(new_group)
+    await db.commit()
+    await db.refresh(new_group)
+    response_cache.bump("groups")
     return new_group
 
 #Get a all Groups
-@router.get("/", response_model=list[schemas.StudyGroupResponse])
-def get_all_groups(db: Session = Depends(get_db)):
+@router.get("/", response_model=list[schemas.StudyGroupDetailResponse], response_model_exclude_unset=True)
+async def get_all_groups(
+    request: Request,
+    page: PageParams = Depends(),
+    expand: tuple = Depends(parse_expand),
+    sort: Literal["id", "popular"] = Query("id", description="`popular` orders by member count, largest first."),
+    db: AsyncSession = Depends(get_db),
+):
     """
     **Public Access**  
-    Retrieves a list of all study groups.
+    Retrieves a page of study groups ordered by ID, or by member count with `sort=popular`.
+    - Use `after` with the `X-Next-Cursor` header value to fetch the next page.
+    - Use `stream=ndjson` or `stream=json` to stream every group instead.
+    - Use `expand=members,sessions,resources` to embed related rows; each
+      relationship costs one extra query for the whole page.
+    - Pages are cached and support `If-None-Match` revalidation.
     """
-    groups = db.query(models.StudyGroup).all()
-    return groups
+    sort_column, descending = GROUP_SORTS[sort]
+    if page.stream:
+        if expand:
+            raise HTTPException(status_code=400, detail="`expand` cannot be combined with `stream`.")
+        return stream_rows(models.StudyGroup, schemas.StudyGroupResponse, page, sort_column=sort_column, descending=descending)
+
+    async def load(response: Response):
+        if not expand:
+            return await paginate_json(
+                db, models.StudyGroup, schemas.StudyGroupResponse, page, response,
+                sort_column=sort_column, descending=descending,
+            )
+        options = [selectinload(getattr(models.StudyGroup, name)) for name in expand]
+        groups = await paginate(
+            db, models.StudyGroup, page, response, sort_column=sort_column, descending=descending, options=options,
+        )
+        return [group_detail(group, expand) for group in groups]
+
+    return await response_cache.serve(
+        request, GROUP_COLLECTIONS, list[schemas.StudyGroupDetailResponse], load, exclude_unset=True,
+    )
 
 #get group by ID
 @router.get("/{group_id}", response_model=schemas.StudyGroupResponse)
-def get_group_by_id(group_id: int, db: Session = Depends(get_db)):
+async def get_group_by_id(group_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """
     **Public Access**  
     Retrieves a study group by its ID.
+    - Cached and supports `If-None-Match` revalidation.
     """
-    group = db.query(models.StudyGroup).filter(models.StudyGroup.id == group_id).first()
+    async def load(response: Response):
+        group = await db.scalar(select(models.StudyGroup).where(models.StudyGroup.id == group_id))
 
-    if not group:
-        raise HTTPException(status_code=404, detail="Study group not found")
+        if not group:
+            raise HTTPException(status_code=404, detail="Study group not found")
+
+        return group
+
+    return await response_cache.serve(request, GROUP_COLLECTIONS, schemas.StudyGroupResponse, load)
 
-    return group
+#get group with members, sessions and resources
+@router.get("/{group_id}/full", response_model=schemas.StudyGroupDetailResponse)
+async def get_group_full(group_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    **Public Access**  
+    Retrieves a study group with its members, sessions and resources.
+    - Loads everything in four queries, whatever the number of children.
+    - Cached and supports `If-None-Match` revalidation.
+    """
+    async def load(response: Response):
+        group = await db.scalar(
+            select(models.StudyGroup)
+            .options(*(selectinload(getattr(models.StudyGroup, name)) for name in EXPANDABLE))
+            .where(models.StudyGroup.id == group_id)
+        )
 
+        if not group:
+            raise HTTPException(status_code=404, detail="Study group not found")
+
+        return group_detail(group, EXPANDABLE)
+
+    return await response_cache.serve(request, GROUP_COLLECTIONS, schemas.StudyGroupDetailResponse, load)
 
 
 # Delete a Study Group (Admin Only)
 @router.delete("/{group_id}", dependencies=[Depends(admin_required)])
-def delete_group(group_id: int, db: Session = Depends(get_db)):
+async def delete_group(group_id: int, db: AsyncSession = Depends(get_db)):
     """
     **Admin Access Required**  
     Deletes a study group by its ID.  
     - Only admins can delete groups.
+    - Members, sessions (live and archived) and resources are removed with one `DELETE` each,
+      without loading them, and the row counts are returned.
     """
-    group = db.query(models.StudyGroup).filter(models.StudyGroup.id == group_id).first()
+    group = await db.scalar(select(models.StudyGroup.id).where(models.StudyGroup.id == group_id))
 
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    db.delete(group)
-    db.commit()
-    return {"message": "Group deleted successfully"}
+    deleted = {}
+    for name, model in (
+        ("members", models.GroupMember), ("sessions", models.StudySession),
+        ("archived_sessions", models.ArchivedStudySession), ("resources", models.Resource),
+    ):
+        result = await db.execute(
+            delete(model).where(model.group_id == group_id).execution_options(synchronize_session=False)
+        )
+        deleted[name] = result.rowcount
+    await db.execute(delete(models.StudyGroup).where(models.StudyGroup.id == group_id).execution_options(synchronize_session=False))
+    await db.commit()
+
+    response_cache.bump("groups", "members", "sessions", "resources")
+    change_feed.notify()
+    return {"message": "Group deleted successfully", "deleted": deleted}
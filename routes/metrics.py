@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+import database
+from core.metrics import metrics
+from core.security import principal_cache
+from core.hashing import password_hasher
+from core.response_cache import response_cache
+from core.rate_limit import auth_rate_limit
+from core.idempotency import idempotency_cache
+from core.changes import change_feed
+from core.reminders import reminder_scheduler
+
+router = APIRouter(tags=["Metrics"])
+
+# Component counters exported next to the request metrics
+metrics.register("principal_cache", principal_cache.stats)
+metrics.register("password_hasher", password_hasher.stats)
+metrics.register("response_cache", response_cache.stats)
+metrics.register("auth_rate_limit", auth_rate_limit.stats)
+metrics.register("idempotency_cache", idempotency_cache.stats)
+metrics.register("db_read_routing", lambda: database.current.router.stats())
+metrics.register("change_feed", change_feed.stats)
+metrics.register("reminders", reminder_scheduler.stats)
+
+# Prometheus scrape endpoint
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    **Public Access**  
+    - Request latency histograms, in-flight requests and status codes per route.
+    - SQL statement counts and time, overall and per route.
+    - Principal cache, password hasher, response cache, auth rate limiter and idempotency cache counters.
+    - Read replica health and routing counters.
+    - Change stream subscribers and published events.
+    - Session reminder backlog, sent reminders and delivery lag.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
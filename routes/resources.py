@@ -1,33 +1,71 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 import models, schemas
 from database import get_db
+from core.pagination import PageParams, paginate_json, stream_rows
+from core.bulk import existing_ids, insert_valid
+from core.response_cache import response_cache
+from core.changes import change_feed
 
 router = APIRouter(tags=["Resources"])
 
 #Add a Resource to a Study Group
 @router.post("/")
-def create_resource(resource: schemas.ResourceCreate, db: Session = Depends(get_db)):
+async def create_resource(resource: schemas.ResourceCreate, db: AsyncSession = Depends(get_db)):
     new_resource = models.Resource(group_id=resource.group_id, title=resource.title, url=resource.url)
     db.add(new_resource)
-    db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # foreign_keys=ON rejects a group_id that does not exist
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Study group not found")
+    response_cache.bump("resources")
+    change_feed.notify()
     return {"message": "Resource added successfully"}
 
+#Add many Resources in one transaction
+@router.post("/bulk", response_model=schemas.BulkResponse)
+async def create_resources_bulk(resources: schemas.ResourceBatch, db: AsyncSession = Depends(get_db)):
+    """
+    **Public Access**  
+    - Adds up to `BULK_MAX_RESOURCES` resources with a single commit.
+    - Items pointing at a missing group are reported and skipped.
+    """
+    groups = await existing_ids(db, models.StudyGroup.id, (item.group_id for item in resources))
+    errors = {
+        index: "Study group not found"
+        for index, item in enumerate(resources) if item.group_id not in groups
+    }
+    result = await insert_valid(db, models.Resource, [item.model_dump() for item in resources], errors)
+    response_cache.bump("resources")
+    change_feed.notify()
+    return result
+
 #get all the resources
 @router.get("/", response_model=list[schemas.ResourceResponse])
-def get_all_resources(db: Session = Depends(get_db)):
+async def get_all_resources(request: Request, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """
     **Public Access**  
-    Retrieves a list of all resources.
+    Retrieves a page of resources ordered by ID.
+    - Use `after` with the `X-Next-Cursor` header value to fetch the next page.
+    - Use `stream=ndjson` or `stream=json` to stream every resource instead.
+    - Pages are cached and support `If-None-Match` revalidation.
     """
-    resources = db.query(models.Resource).all()
-    return resources
+    if page.stream:
+        return stream_rows(models.Resource, schemas.ResourceResponse, page)
+    return await response_cache.serve(
+        request, ("resources",), list[schemas.ResourceResponse],
+        lambda response: paginate_json(db, models.Resource, schemas.ResourceResponse, page, response),
+    )
 
 
 #update the resources
 @router.put("/{resource_id}", response_model=schemas.ResourceUpdate)
-def update_resource(resource_id: int, resource_update: schemas.ResourceUpdate, db: Session = Depends(get_db)):
-    resource = db.query(models.Resource).filter(models.Resource.id == resource_id).first()
+async def update_resource(resource_id: int, resource_update: schemas.ResourceUpdate, db: AsyncSession = Depends(get_db)):
+    resource = await db.scalar(select(models.Resource).where(models.Resource.id == resource_id))
     
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
@@ -37,6 +75,8 @@ def update_resource(resource_id: int, resource_update: schemas.ResourceUpdate, d
     for key, value in update_data.items():
         setattr(resource, key, value)
     
-    db.commit()
-    db.refresh(resource)
+    await db.commit()
+    await db.refresh(resource)
+    response_cache.bump("resources")
+    change_feed.notify()
     return resource
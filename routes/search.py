@@ -0,0 +1,53 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas
+from database import get_db
+from config import settings
+from core.pagination import NEXT_CURSOR_HEADER
+from core.response_cache import response_cache
+from core.search import match_expression, search_statement
+
+router = APIRouter(tags=["Search"])
+
+# Result types searched for each `type` filter
+SEARCH_TYPES = {
+    None: ("group", "resource"),
+    "groups": ("group",),
+    "resources": ("resource",),
+}
+
+# Search groups and resources
+@router.get("", response_model=list[schemas.SearchResult])
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for; each one matches as a prefix."),
+    type: Optional[Literal["groups", "resources"]] = Query(None, description="Only return groups or only resources."),
+    after: Optional[int] = Query(None, ge=0, description="Position in the ranked results; pass the X-Next-Cursor header value."),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX, description="Maximum number of results to return."),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    **Public Access**  
+    Full-text search over group names and descriptions and resource titles and URLs.
+    - Every word must match; `pyth data` finds "Python Data Science".
+    - Results are ranked by relevance, names and titles weighing most.
+    - Use `after` with the `X-Next-Cursor` header value to fetch the next page.
+    """
+    query = match_expression(q)
+    if not query:
+        raise HTTPException(status_code=400, detail="Search query has no searchable words.")
+    page_size = limit or settings.PAGE_SIZE_DEFAULT
+    offset = after or 0
+
+    async def load(response: Response):
+        rows = (await db.execute(
+            search_statement(SEARCH_TYPES[type]),
+            {"query": query, "limit": page_size + 1, "offset": offset},
+        )).mappings().all()
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            response.headers[NEXT_CURSOR_HEADER] = str(offset + page_size)
+        return rows
+
+    return await response_cache.serve(request, ("groups", "resources"), list[schemas.SearchResult], load)
@@ -1,64 +1,255 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import models, schemas
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+import models, schemas, database
 from database import get_db
-from core.security import get_current_user
+from config import settings
+from core.security import get_current_user, Principal
+from core.pagination import PageParams, paginate_json, stream_rows
+from core.bulk import existing_ids, insert_valid
+from core.response_cache import response_cache
+from core.changes import change_feed
+from core.reminders import reminder_scheduler
+from core.calendar import ICS_MEDIA_TYPE, CALENDAR_FOOTER, calendar_header, calendar_event
 from models import StudySession  
 
 router = APIRouter(tags=["Sessions"])
 
 # Dependency to Check Admin Access
-def admin_required(current_user: models.User = Depends(get_current_user)):
+async def admin_required(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required.")
     return current_user
 
+# Live and archived sessions as one UNION ALL, mapped like StudySession (ids never overlap)
+_SESSION_COLUMNS = ("id", "group_id", "scheduled_time")
+SessionsWithArchive = aliased(models.StudySession, union_all(
+    select(*(getattr(models.StudySession, column) for column in _SESSION_COLUMNS)),
+    select(*(getattr(models.ArchivedStudySession, column) for column in _SESSION_COLUMNS)),
+).subquery("sessions_with_archive"))
+
+class SessionFilters:
+    """Time-range filters shared by the session list and calendar feed."""
+
+    def __init__(
+        self,
+        group_id: Optional[int] = Query(None, description="Only sessions of this study group."),
+        from_: Optional[datetime] = Query(None, alias="from", description="Only sessions scheduled at or after this time."),
+        to: Optional[datetime] = Query(None, description="Only sessions scheduled before this time."),
+        order: Optional[Literal["asc", "desc"]] = Query(None, description="Sort by scheduled time instead of ID."),
+        include_archived: bool = Query(False, description="Also return past sessions moved to the archive."),
+    ):
+        self.group_id = group_id
+        self.from_ = from_
+        self.to = to
+        self.order = order
+        self.include_archived = include_archived
+
+    @property
+    def model(self):
+        """StudySession, or the union with the archive when `include_archived` is set."""
+        return SessionsWithArchive if self.include_archived else models.StudySession
+
+    def criteria(self) -> tuple:
+        """WHERE clauses served by the (group_id, scheduled_time) index of each table."""
+        model = self.model
+        clauses = []
+        if self.group_id is not None:
+            clauses.append(model.group_id == self.group_id)
+        if self.from_ is not None:
+            clauses.append(model.scheduled_time >= self.from_)
+        if self.to is not None:
+            clauses.append(model.scheduled_time < self.to)
+        return tuple(clauses)
+
+    def sort(self) -> dict:
+        if self.order is None:
+            return {}
+        return {"sort_column": self.model.scheduled_time, "descending": self.order == "desc"}
+
+
+def upcoming_sessions_query(filters: SessionFilters, per_group: int):
+    """
+    Selects the next `per_group` sessions of every group, starting at `from` (default: now).
+    - Reads `filters.model`, so `include_archived` also ranks archived sessions.
+    """
+    model = filters.model
+    start = filters.from_ or datetime.utcnow()
+    criteria = [model.scheduled_time >= start, *filters.criteria()]
+    ranked = select(
+        model.id,
+        func.row_number().over(
+            partition_by=model.group_id,
+            order_by=(model.scheduled_time, model.id),
+        ).label("rank"),
+    ).where(*criteria).subquery()
+
+    return (
+        select(model)
+        .join(ranked, ranked.c.id == model.id)
+        .where(ranked.c.rank <= per_group)
+        .order_by(model.group_id, model.scheduled_time, model.id)
+    )
+
+async def commit_new_session(db: AsyncSession):
+    """Commits a new session; foreign_keys=ON rejects a group_id that does not exist."""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Study group not found")
+
 # Create a Session (Admin Only)
 @router.post("/", response_model=schemas.StudySessionResponse, dependencies=[Depends(admin_required)])
-def create_session(session_data: schemas.StudySessionCreate, db: Session = Depends(get_db)):
+async def create_session(session_data: schemas.StudySessionCreate, db: AsyncSession = Depends(get_db)):
     """
     **Admin Access Required**  
     - Creates a **new session** for a study group.
+    - Returns 404 if the study group does not exist.
     """
     new_session = models.StudySession(**session_data.dict())
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await commit_new_session(db)
+    await db.refresh(new_session)
+    response_cache.bump("sessions")
+    change_feed.notify()
+    reminder_scheduler.add(new_session.id, new_session.group_id, new_session.scheduled_time)
     return new_session
 
 #create a sessions
 @router.post("/", response_model=schemas.StudySessionResponse)
-def create_session(
+async def create_session(
     session_data: schemas.StudySessionCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only admins can create sessions.")
 
     new_session = models.StudySession(**session_data.dict())  # ✅ Use StudySession
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await commit_new_session(db)
+    await db.refresh(new_session)
+    response_cache.bump("sessions")
+    change_feed.notify()
+    reminder_scheduler.add(new_session.id, new_session.group_id, new_session.scheduled_time)
     return new_session
 
+# Create many Sessions in one transaction (Admin Only)
+@router.post("/bulk", response_model=schemas.BulkResponse, dependencies=[Depends(admin_required)])
+async def create_sessions_bulk(sessions: schemas.StudySessionBatch, db: AsyncSession = Depends(get_db)):
+    """
+    **Admin Access Required**  
+    - Creates up to `BULK_MAX_SESSIONS` sessions with a single commit.
+    - Items pointing at a missing group are reported and skipped.
+    """
+    groups = await existing_ids(db, models.StudyGroup.id, (item.group_id for item in sessions))
+    errors = {
+        index: "Study group not found"
+        for index, item in enumerate(sessions) if item.group_id not in groups
+    }
+    result = await insert_valid(db, models.StudySession, [item.model_dump() for item in sessions], errors)
+    response_cache.bump("sessions")
+    change_feed.notify()
+    for item in result.results:
+        if item.id is not None:
+            reminder_scheduler.add(item.id, sessions[item.index].group_id, sessions[item.index].scheduled_time)
+    return result
+
 #get all sessions
 @router.get("/", response_model=list[schemas.StudySessionResponse])
-def get_sessions(db: Session = Depends(get_db)):
+async def get_sessions(
+    request: Request,
+    page: PageParams = Depends(),
+    filters: SessionFilters = Depends(),
+    upcoming: Optional[int] = Query(None, ge=1, le=settings.SESSIONS_UPCOMING_MAX, description="Return the next N sessions of each group."),
+    db: AsyncSession = Depends(get_db),
+):
     """
     **Public Access**  
-    - Retrieves all study sessions.
+    - Retrieves a page of study sessions ordered by ID, or by scheduled time with `order=asc|desc`.
+    - Filter with `group_id`, `from` and `to`.
+    - Use `after` with the `X-Next-Cursor` header value to fetch the next page.
+    - Use `stream=ndjson` or `stream=json` to stream every session instead.
+    - Use `upcoming=N` to get the next N sessions of each group (not paginated).
+    - Past sessions are archived after `SESSION_ARCHIVE_AFTER_DAYS`; add `include_archived=true` to list them too.
+    - Pages are cached and support `If-None-Match` revalidation.
     """
-    return db.query(models.StudySession).all()
+    if upcoming is not None:
+        if page.after is not None or page.stream:
+            raise HTTPException(status_code=400, detail="`upcoming` cannot be combined with `after` or `stream`.")
+        return (await db.scalars(upcoming_sessions_query(filters, upcoming))).all()
+
+    if page.stream:
+        return stream_rows(filters.model, schemas.StudySessionResponse, page, filters.criteria(), **filters.sort())
+    return await response_cache.serve(
+        request, ("sessions",), list[schemas.StudySessionResponse],
+        lambda response: paginate_json(
+            db, filters.model, schemas.StudySessionResponse, page, response, filters.criteria(), **filters.sort(),
+        ),
+    )
+
+# iCalendar feed of a group's sessions
+@router.get("/groups/{group_id}/calendar.ics", response_class=StreamingResponse)
+async def get_group_calendar(
+    group_id: int,
+    from_: Optional[datetime] = Query(None, alias="from", description="Only sessions scheduled at or after this time."),
+    to: Optional[datetime] = Query(None, description="Only sessions scheduled before this time."),
+    include_archived: bool = Query(False, description="Also include past sessions moved to the archive."),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    **Public Access**  
+    - Streams a group's sessions as an iCalendar feed for calendar clients.
+    - Accepts the same `from`, `to` and `include_archived` filters as the session list.
+    """
+    group = await db.scalar(select(models.StudyGroup).where(models.StudyGroup.id == group_id))
+    if not group:
+        raise HTTPException(status_code=404, detail="Study group not found")
+
+    filters = SessionFilters(group_id=group_id, from_=from_, to=to, order="asc", include_archived=include_archived)
+    model = filters.model
+    stmt = select(model.id, model.scheduled_time).where(
+        model.scheduled_time.is_not(None), *filters.criteria()
+    ).order_by(model.scheduled_time, model.id)
+    duration = timedelta(minutes=settings.SESSION_DURATION_MINUTES)
+    summary = f"{group.name} study session"
+    stamp = datetime.utcnow()
+
+    async def body():
+        yield calendar_header(group.name)
+        async with database.ReadSessionLocal() as stream_db:
+            result = await stream_db.stream(stmt.execution_options(yield_per=settings.STREAM_YIELD_PER))
+            async for rows in result.partitions():
+                yield "".join(calendar_event(session_id, start, summary, duration, stamp) for session_id, start in rows)
+        yield CALENDAR_FOOTER
+
+    return StreamingResponse(
+        body(),
+        media_type=ICS_MEDIA_TYPE,
+        headers={"Content-Disposition": f'inline; filename="group-{group_id}.ics"'},
+    )
 
 #get session by id
 @router.get("/{session_id}", response_model=schemas.StudySessionResponse)
-def get_session(session_id: int, db: Session = Depends(get_db)):
+async def get_session(
+    session_id: int,
+    include_archived: bool = Query(False, description="Also look the session up in the archive."),
+    db: AsyncSession = Depends(get_db),
+):
     """
     **Public Access**  
     - Retrieves a study session by its ID.
+    - Archived past sessions are only found with `include_archived=true`.
     """
-    session = db.query(models.StudySession).filter(models.StudySession.id == session_id).first()
+    session = await db.scalar(select(models.StudySession).where(models.StudySession.id == session_id))
+    if not session and include_archived:
+        session = await db.scalar(select(models.ArchivedStudySession).where(models.ArchivedStudySession.id == session_id))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
@@ -67,15 +258,18 @@ def get_session(session_id: int, db: Session = Depends(get_db)):
 
 # Delete a Session (Admin Only)
 @router.delete("/{session_id}", dependencies=[Depends(admin_required)])
-def delete_session(session_id: int, db: Session = Depends(get_db)):
+async def delete_session(session_id: int, db: AsyncSession = Depends(get_db)):
     """
     **Admin Access Required**  
     - Allows an admin to **delete any session**.
     """
-    session = db.query(models.StudySession).filter(models.StudySession.id == session_id).first()
+    session = await db.scalar(select(models.StudySession).where(models.StudySession.id == session_id))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
+    response_cache.bump("sessions")
+    change_feed.notify()
+    reminder_scheduler.remove(session_id)
     return {"message": "Session deleted successfully"}
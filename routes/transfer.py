@@ -0,0 +1,80 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+import schemas, database
+from core.security import get_current_user, Principal
+from core.response_cache import response_cache
+from core.transfer import FORMATS, export_rows, import_records, iter_lines, iter_records
+
+router = APIRouter(tags=["Import/Export"])
+
+# Dependency to Check Admin Access
+async def admin_required(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required.")
+    return current_user
+
+# Cached collections that change when each table is imported
+IMPORT_COLLECTIONS = {
+    "users": (),
+    "groups": ("groups",),
+    "members": ("members", "groups"),
+}
+
+
+def request_format(request: Request, format: Optional[str]) -> str:
+    """Uses `format` when given, otherwise the request's Content-Type."""
+    if format is not None:
+        return format
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    for name, media_type in FORMATS.items():
+        if content_type == media_type:
+            return name
+    raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson.")
+
+
+# Import users, groups or memberships (Admin Only)
+@router.post("/import/{kind}", response_model=schemas.ImportResponse, dependencies=[Depends(admin_required)])
+async def import_data(
+    kind: Literal["users", "groups", "members"],
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Body format; defaults to the Content-Type."),
+):
+    """
+    **Admin Access Required**  
+    Streams a CSV (with a header line) or NDJSON body into the database.
+    - users: `name`, `email`, `password`, optional `role`; passwords are hashed in parallel.
+    - groups: `name`, optional `description`.
+    - members: `group_id` and either `user_id` or `email`.
+    - Rows are inserted `IMPORT_CHUNK_SIZE` per transaction; invalid rows are
+      skipped and listed with their row number.
+    """
+    fmt = request_format(request, format)
+    records = iter_records(iter_lines(request.stream()), fmt)
+    report = await import_records(database.AsyncSessionLocal, kind, records)
+    if report.created and IMPORT_COLLECTIONS[kind]:
+        response_cache.bump(*IMPORT_COLLECTIONS[kind])
+    return report
+
+
+# Export a table (Admin Only)
+@router.get("/export/{kind}", response_class=StreamingResponse, dependencies=[Depends(admin_required)])
+async def export_data(
+    kind: Literal["users", "groups", "members", "sessions", "resources"],
+    format: Literal["csv", "ndjson"] = Query("ndjson", description="Output format."),
+):
+    """
+    **Admin Access Required**  
+    - Streams every row of a table as CSV or NDJSON, in ID order.
+    - Password hashes are never exported.
+    """
+    async def body():
+        async with database.ReadSessionLocal() as db:
+            async for chunk in export_rows(db, kind, format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
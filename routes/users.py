@@ -1,29 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 import models, schemas
 from database import get_db
-from core.security import get_current_user 
+from core.security import get_current_user, invalidate_principal, Principal
+from core.pagination import PageParams, paginate_json, stream_rows
+from core.response_cache import response_cache
 
 router = APIRouter(tags=["Users"])
 
 # Dependency to Check Admin Access
-def admin_required(current_user: models.User = Depends(get_current_user)):
+async def admin_required(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required.")
     return current_user
 
 # Get All Users (Admin Only)
 @router.get("/", response_model=list[schemas.UserResponse])
-def get_users(db: Session = Depends(get_db)):
+async def get_users(response: Response, page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """
     **Admin Access Required**  
-    Retrieves a list of all users.
+    Retrieves a page of users ordered by ID.
+    - Use `after` with the `X-Next-Cursor` header value to fetch the next page.
+    - Use `stream=ndjson` or `stream=json` to stream every user instead.
     """
-    return db.query(models.User).all()
+    if page.stream:
+        return stream_rows(models.User, schemas.UserResponse, page)
+    body = await paginate_json(db, models.User, schemas.UserResponse, page, response)
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
 
 # Get User by ID (User & Admin)
 @router.get("/{user_id}", response_model=schemas.UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     """
     **User or Admin Access**  
     - Users can only access their **own profile**.  
@@ -32,42 +40,44 @@ def get_user(user_id: int, db: Session = Depends(get_db), current_user: models.U
     if current_user.id != user_id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied.")
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 # Update User Profile (User Only)
 @router.put("/update-profile", response_model=schemas.UserResponse)
-def update_profile(
-    user_update: schemas.UserUpdate, db: Session = Depends(get_db)
+async def update_profile(
+    user_update: schemas.UserUpdate, db: AsyncSession = Depends(get_db)
 ):
     """
     **User Access Only**  
     - Users can **update their own profile**.
     """
-    user = db.query(models.User).filter(models.User.email == user_update.email).first()
+    user = await db.scalar(select(models.User).where(models.User.email == user_update.email))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    previous_email = user.email
     if user_update.name is not None:  
         user.name = user_update.name  
     if user_update.email is not None:
         user.email = user_update.email
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    invalidate_principal(previous_email, user_update.email or previous_email)
+    await db.refresh(user)
     return user
 
 
 
 # Promote User to Admin (Admin Only)
 @router.put("/promote/{user_id}")
-def promote_user(
+async def promote_user(
     user_id: int, 
-    db: Session = Depends(get_db), 
-    current_user: models.User = Depends(get_current_user)  # ✅ Ensure it uses models.User
+    db: AsyncSession = Depends(get_db), 
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     **Admin Access Required**  
@@ -79,7 +89,7 @@ def promote_user(
         raise HTTPException(status_code=403, detail="Only admins can promote users.")
 
     # ✅ Find the user to be promoted
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.scalar(select(models.User).where(models.User.id == user_id))
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -90,8 +100,10 @@ def promote_user(
 
     # ✅ Promote the user
     user.role = "admin"
-    db.commit()
-    db.refresh(user)
+    email = user.email
+    await db.commit()
+    invalidate_principal(email)
+    await db.refresh(user)
 
     return {"message": f"User {user.email} has been promoted to admin."}
 
@@ -100,24 +112,27 @@ def promote_user(
 
 # Delete User (Admin Only)
 @router.delete("/{user_id}", dependencies=[Depends(admin_required)])
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """
     **Admin Access Required**  
     - Allows an **admin to delete a user and all related data**.
+    - Memberships are removed with a single `DELETE` and counted.
     """
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    email = await db.scalar(select(models.User.email).where(models.User.id == user_id))
     
-    if not user:
+    if not email:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Delete related data before deleting the user
-    db.query(models.StudyGroup).filter(models.StudyGroup.owner_id == user_id).delete(synchronize_session=False)
-    db.query(models.StudySession).filter(models.StudySession.created_by == user_id).delete(synchronize_session=False)
-    db.query(models.Resource).filter(models.Resource.uploaded_by == user_id).delete(synchronize_session=False)
-    db.query(models.GroupMember).filter(models.GroupMember.user_id == user_id).delete(synchronize_session=False)
+    result = await db.execute(
+        delete(models.GroupMember).where(models.GroupMember.user_id == user_id).execution_options(synchronize_session=False)
+    )
+    deleted = {"members": result.rowcount}
 
     # Now, delete the user
-    db.delete(user)
-    db.commit()
+    await db.execute(delete(models.User).where(models.User.id == user_id).execution_options(synchronize_session=False))
+    await db.commit()
+    invalidate_principal(email)
+    response_cache.bump("members")
 
-    return {"message": "User and all related data deleted successfully"}
+    return {"message": "User and all related data deleted successfully", "deleted": deleted}
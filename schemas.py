@@ -1,14 +1,8 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Annotated, Literal, Optional
 from datetime import datetime
-from passlib.context import CryptContext
 import enum
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    """Hash the password using bcrypt."""
-    return pwd_context.hash(password)
+from config import settings
 
 # Token Schemas
 class TokenResponse(BaseModel):
@@ -54,6 +48,9 @@ class StudyGroupCreate(BaseModel):
 
 class StudyGroupResponse(StudyGroupCreate):
     id: int
+    member_count: int = 0
+    session_count: int = 0
+    resource_count: int = 0
 
     class Config:
         from_attributes = True
@@ -63,11 +60,25 @@ class GroupMemberCreate(BaseModel):
     user_id: int
     group_id: int
 
+class GroupMemberImport(BaseModel):
+    group_id: int
+    user_id: Optional[int] = None  # Either the user's ID ...
+    email: Optional[EmailStr] = None  # ... or their email address
+
+    @model_validator(mode="after")
+    def check_user(self):
+        if (self.user_id is None) == (self.email is None):
+            raise ValueError("Give either user_id or email")
+        return self
+
 class GroupMemberResponse(BaseModel):
     id: int
     user_id: int
     group_id: int
 
+    class Config:
+        from_attributes = True
+
 # Study Session Schemas
 class StudySessionCreate(BaseModel):
     group_id: int
@@ -105,3 +116,67 @@ class ResourceResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Group Detail Schemas
+class StudyGroupDetailResponse(StudyGroupResponse):
+    # Only the expanded relationships are present in the response
+    members: Optional[list[GroupMemberResponse]] = None
+    sessions: Optional[list[StudySessionResponse]] = None
+    resources: Optional[list[ResourceResponse]] = None
+
+# Bulk Schemas
+# Request bodies of the /bulk endpoints; a longer list is rejected with 422 before any item is checked
+ResourceBatch = Annotated[list[ResourceCreate], Field(max_length=settings.BULK_MAX_RESOURCES)]
+StudySessionBatch = Annotated[list[StudySessionCreate], Field(max_length=settings.BULK_MAX_SESSIONS)]
+GroupMemberBatch = Annotated[list[GroupMemberCreate], Field(max_length=settings.BULK_MAX_MEMBERS)]
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None  # Set when the item was created
+    error: Optional[str] = None  # Set when the item was rejected
+
+class BulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkItemResult]
+
+# Search Schemas
+class SearchResult(BaseModel):
+    type: Literal["group", "resource"]
+    id: int
+    group_id: int  # The group itself, or the group owning the resource
+    title: str  # Group name or resource title
+    text: Optional[str] = None  # Group description or resource URL
+    rank: float  # bm25 score; lower is more relevant
+
+# Change feed Schema
+class ChangeResponse(BaseModel):
+    id: int  # Cursor: pass the last one seen as `since`
+    entity: Literal["session", "resource"]
+    entity_id: int
+    op: Literal["insert", "update", "delete", "archive"]
+    group_id: Optional[int] = None
+    data: Optional[dict] = None  # The row after the change; null for deletes
+    changed_at: datetime
+
+# Import / Export Schemas
+class UserExport(BaseModel):
+    id: int
+    name: str
+    email: str
+    role: Optional[UserRole] = None
+
+class StudyGroupExport(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row (CSV header not counted)
+    error: str
+
+class ImportResponse(BaseModel):
+    created: int
+    failed: int
+    errors: list[ImportRowError]  # At most IMPORT_MAX_ERRORS entries
+    errors_truncated: bool = False
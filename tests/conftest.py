@@ -0,0 +1,41 @@
+"""
+Settings for the test suite, applied before any app module reads `config.settings`.
+
+The suite runs against its own SQLite file, seeded once per session with
+`benchmarks.seed`. The response and principal caches, the auth rate limiter
+and the reminder scheduler are off, so every request does its full work.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="study-group-tests-")
+DATABASE = os.path.join(DATA_DIR, "test.db")
+
+# Seeded dataset; the query budgets are calibrated against it
+DATASET = ["--users", "200", "--groups", "20", "--sessions-per-group", "20", "--resources-per-group", "10"]
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DATABASE}",
+    "AUTH_RATE_LIMIT_ENABLED": "false",
+    "RESPONSE_CACHE_SIZE": "0",
+    "PRINCIPAL_CACHE_SIZE": "0",
+    "REMINDERS_ENABLED": "false",
+    "METRICS_ENABLED": "true",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient on `main.app` over the seeded database, with the lifespan running."""
+    from fastapi.testclient import TestClient
+    from benchmarks.seed import build_parser, seed
+
+    seed(build_parser().parse_args(["--database", DATABASE, *DATASET]))
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
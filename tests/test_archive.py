@@ -0,0 +1,61 @@
+"""Moving past sessions into study_sessions_archive."""
+from datetime import datetime
+
+import database
+from benchmarks.seed import PASSWORD, email
+from core.archive import archive_sessions
+
+GROUP_ID = 5
+
+
+def test_ids_of_archived_sessions_are_not_reused(client):
+    token = client.post("/auth/login", json={"email": email(1), "password": PASSWORD}).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+
+    def create(when):
+        response = client.post("/sessions/", json={"group_id": GROUP_ID, "scheduled_time": when}, headers=admin)
+        return response.json()["id"]
+
+    def session_count():
+        return client.get(f"/groups/{GROUP_ID}").json()["session_count"]
+
+    before = session_count()
+    past = create("2000-01-01T10:00:00")
+    newest = create("2031-01-01T10:00:00")
+    assert client.portal.call(archive_sessions, database.current.async_engine, datetime(2001, 1, 1), 100, 0, 0) == 1
+
+    # Once the newest session is gone the archived id is the highest one ever used
+    assert client.delete(f"/sessions/{newest}", headers=admin).status_code == 200
+    created = create("2031-01-02T10:00:00")
+    assert created > newest
+    assert session_count() == before + 2
+
+    assert client.delete(f"/sessions/{created}", headers=admin).status_code == 200
+    assert session_count() == before + 1
+    changes = client.get("/changes", params={"since": 0, "limit": 1000}).json()
+    ops = {(change["entity_id"], change["op"]) for change in changes if change["entity"] == "session"}
+    assert {(past, "archive"), (created, "delete")} <= ops
+
+    listed = client.get("/sessions/", params={"group_id": GROUP_ID, "include_archived": True, "limit": 1000}).json()
+    ids = [session["id"] for session in listed]
+    assert past in ids and len(ids) == len(set(ids))
+
+
+
+def test_upcoming_sessions_include_archived_ones_on_request(client):
+    group_id = GROUP_ID + 1
+    token = client.post("/auth/login", json={"email": email(1), "password": PASSWORD}).json()["access_token"]
+    client.post(
+        "/sessions/", json={"group_id": group_id, "scheduled_time": "2000-06-01T10:00:00"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    client.portal.call(archive_sessions, database.current.async_engine, datetime(2001, 1, 1), 100, 0, 0)
+
+    params = {"group_id": group_id, "upcoming": 3, "from": "1999-01-01T00:00:00"}
+    live = client.get("/sessions/", params=params).json()
+    both = client.get("/sessions/", params={**params, "include_archived": True}).json()
+
+    assert len(live) == 3 and all(session["group_id"] == group_id for session in live)
+    assert len(both) == 3 and all(session["group_id"] == group_id for session in both)
+    assert both[0]["scheduled_time"].startswith("2000-06-01")
+    assert both[1:] == live[:2]
@@ -0,0 +1,20 @@
+"""Request validation of the /bulk endpoints."""
+import pytest
+
+from benchmarks.seed import PASSWORD, email
+from config import settings
+
+ITEMS = {
+    "/resources/bulk": (settings.BULK_MAX_RESOURCES, {"group_id": 1, "title": "Too many", "url": "https://example.com/x"}),
+    "/sessions/bulk": (settings.BULK_MAX_SESSIONS, {"group_id": 1, "scheduled_time": "2030-01-01T10:00:00"}),
+    "/groups/members/bulk": (settings.BULK_MAX_MEMBERS, {"user_id": 2, "group_id": 1}),
+}
+
+
+@pytest.mark.parametrize("path", list(ITEMS))
+def test_oversized_batch_is_rejected_by_the_schema(client, path):
+    token = client.post("/auth/login", json={"email": email(1), "password": PASSWORD}).json()["access_token"]
+    maximum, item = ITEMS[path]
+    response = client.post(path, json=[item] * (maximum + 1), headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
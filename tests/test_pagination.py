@@ -0,0 +1,43 @@
+"""Keyset pagination through the X-Next-Cursor header."""
+from benchmarks.seed import PASSWORD, email
+
+
+def admin(client):
+    token = client.post("/auth/login", json={"email": email(1), "password": PASSWORD}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def pages(client, path, params):
+    """Follows X-Next-Cursor to the end and returns the ids of every page."""
+    ids, after = [], None
+    while True:
+        response = client.get(path, params={**params, **({"after": after} if after else {})})
+        assert response.status_code == 200, response.text
+        ids.append([row["id"] for row in response.json()])
+        after = response.headers.get("X-Next-Cursor")
+        if after is None:
+            return ids
+
+
+def test_sorted_pages_match_one_page(client):
+    everything = client.get("/groups/", params={"sort": "popular", "limit": 1000}).json()
+    paged = pages(client, "/groups/", {"sort": "popular", "limit": 7})
+    assert [group_id for page in paged for group_id in page] == [group["id"] for group in everything]
+
+
+def test_paging_goes_on_after_the_cursor_row_is_deleted(client):
+    params = {"group_id": 3, "order": "asc", "limit": 5}
+    first = client.get("/sessions/", params=params)
+    cursor = first.headers["X-Next-Cursor"]
+    expected = client.get("/sessions/", params={**params, "after": cursor}).json()
+
+    deleted = first.json()[-1]["id"]
+    assert client.delete(f"/sessions/{deleted}", headers=admin(client)).status_code == 200
+    response = client.get("/sessions/", params={**params, "after": cursor})
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+def test_cursor_must_match_the_sort(client):
+    assert client.get("/sessions/", params={"group_id": 3, "order": "asc", "after": "12"}).status_code == 400
+    assert client.get("/sessions/", params={"after": "2030-01-01T00:00:00:12"}).status_code == 400
@@ -0,0 +1,283 @@
+"""
+SQL budget per route: the most statements one request may run and the most
+rows it may fetch.
+
+Every API route is called through the TestClient against the seeded database
+(see conftest.py). The `/metrics` engine listeners charge each statement to
+the route template of the request that ran it. A route over its budget fails
+and lists the statements it ran.
+- Rows are counted for session queries. Streamed responses (`?stream`,
+  exports, the calendar) only count statements.
+- Bulk routes must run the same number of statements whatever the batch
+  size; each one is also called with two batch sizes to check it.
+"""
+import io
+import itertools
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.seed import PASSWORD, email
+
+# "METHOD /route/template" -> (max statements, max rows fetched) per request
+BUDGETS = {
+    "POST /auth/register": (3, 1),
+    "POST /auth/login": (1, 1),
+    "GET /users/": (1, 51),
+    "GET /users/{user_id}": (2, 2),
+    "PUT /users/update-profile": (3, 2),
+    "PUT /users/promote/{user_id}": (4, 3),
+    "DELETE /users/{user_id}": (4, 2),
+    "POST /groups/join-group": (1, 0),
+    "POST /groups/members/bulk": (5, 21),
+    "DELETE /groups/leave-group/{user_id}": (2, 1),
+    "POST /groups/": (3, 2),
+    "GET /groups/": (3, 621),
+    "GET /groups/{group_id}": (1, 1),
+    "GET /groups/{group_id}/full": (4, 34),
+    "DELETE /groups/{group_id}": (7, 2),
+    "POST /sessions/": (3, 2),
+    "POST /sessions/bulk": (4, 7),
+    "GET /sessions/": (1, 51),
+    "GET /sessions/groups/{group_id}/calendar.ics": (2, 1),
+    "GET /sessions/{session_id}": (1, 1),
+    "DELETE /sessions/{session_id}": (3, 2),
+    "POST /resources/": (1, 0),
+    "POST /resources/bulk": (3, 6),
+    "GET /resources/": (1, 51),
+    "PUT /resources/{resource_id}": (3, 2),
+    "GET /search": (1, 51),
+    "GET /changes": (2, 52),
+    "POST /data/import/{kind}": (3, 1),
+    "GET /data/export/{kind}": (2, 1),
+    "GET /metrics": (0, 0),
+    "GET /": (0, 0),
+    "GET /{full_path:path}": (0, 0),
+}
+
+# Routes that are not called, with the reason
+EXEMPT = {
+    "GET /changes/stream": "never ends on its own; its reads are the ones GET /changes makes",
+}
+
+
+class QueryLog:
+    """
+    Keeps the SQL of every request made while it is open, per
+    "METHOD /route/template".
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.requests = defaultdict(list)
+        self.unexpected = []
+
+    def __call__(self, method, route, status, seconds, sql):
+        self.requests[f"{method} {route}"].append(sql)
+
+    def __enter__(self):
+        self.metrics.start_capture()
+        self.metrics.add_listener(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.remove_listener(self)
+        self.metrics.stop_capture()
+
+
+class Context:
+    def __init__(self):
+        self.admin = {}
+        self.user_id = None
+        self.user_email = None
+        self.group_id = None
+        self.session_id = None
+        self.resource_id = None
+
+
+def register(client, ctx):
+    ctx.user_email = "budget@example.com"
+    response = client.post("/auth/register", json={"name": "Budget", "email": ctx.user_email, "password": PASSWORD})
+    ctx.user_id = response.json().get("id")
+    return response
+
+
+def login(client, ctx):
+    response = client.post("/auth/login", json={"email": email(1), "password": PASSWORD})
+    ctx.admin = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return response
+
+
+def create_group(client, ctx):
+    response = client.post("/groups/", json={"name": "Budget group", "description": "Query budget"}, headers=ctx.admin)
+    ctx.group_id = response.json().get("id")
+    return response
+
+
+def create_session(client, ctx):
+    when = datetime.utcnow() + timedelta(days=1)
+    response = client.post(
+        "/sessions/", json={"group_id": ctx.group_id, "scheduled_time": when.isoformat()}, headers=ctx.admin,
+    )
+    ctx.session_id = response.json().get("id")
+    return response
+
+
+def create_resource(client, ctx):
+    return client.post("/resources/", json={"group_id": ctx.group_id, "title": "Budget", "url": "https://example.com/b"})
+
+
+def bulk_sessions(client, ctx, size=5):
+    start = datetime.utcnow() + timedelta(days=2)
+    items = [{"group_id": ctx.group_id, "scheduled_time": (start + timedelta(days=n)).isoformat()} for n in range(size)]
+    return client.post("/sessions/bulk", json=items, headers=ctx.admin)
+
+
+def bulk_resources(client, ctx, size=5):
+    items = [{"group_id": ctx.group_id, "title": f"Bulk {n}", "url": f"https://example.com/bulk/{n}"} for n in range(size)]
+    response = client.post("/resources/bulk", json=items)
+    ctx.resource_id = response.json()["results"][0]["id"]
+    return response
+
+
+def bulk_members(client, ctx, user_ids=range(2, 12)):
+    return client.post("/groups/members/bulk", json=[{"user_id": user_id, "group_id": ctx.group_id} for user_id in user_ids])
+
+
+_new_users = itertools.count()
+
+
+def new_members(client, ctx, size):
+    """Registers `size` users outside any group and adds them with one bulk call."""
+    user_ids = [
+        client.post("/auth/register", json={"name": "Bulk", "email": f"bulk{next(_new_users)}@example.com", "password": PASSWORD}).json()["id"]
+        for _ in range(size)
+    ]
+    return bulk_members(client, ctx, user_ids)
+
+
+def import_groups(client, ctx):
+    body = io.BytesIO(b"name,description\nImported one,First\nImported two,\n")
+    return client.post("/data/import/groups", content=body.getvalue(), headers={**ctx.admin, "Content-Type": "text/csv"})
+
+
+# (expected status, call) in the order they run; deletes come last
+CASES = [
+    (200, register),
+    (200, login),
+    (200, lambda client, ctx: client.get("/users/", params={"limit": 50})),
+    (200, lambda client, ctx: client.get(f"/users/{ctx.user_id}", headers=ctx.admin)),
+    (200, lambda client, ctx: client.put("/users/update-profile", json={"email": ctx.user_email, "name": "Budget Two"})),
+    (200, create_group),
+    (200, lambda client, ctx: client.post("/groups/join-group", json={"user_id": ctx.user_id, "group_id": ctx.group_id})),
+    (200, bulk_members),
+    (200, lambda client, ctx: client.get("/groups/", params={"limit": 50})),
+    (200, lambda client, ctx: client.get("/groups/", params={"limit": 20, "expand": "sessions,resources"})),
+    (200, lambda client, ctx: client.get("/groups/", params={"limit": 50, "sort": "popular"})),
+    (200, lambda client, ctx: client.get("/groups/1")),
+    (200, lambda client, ctx: client.get("/groups/1/full")),
+    (200, create_session),
+    (200, bulk_sessions),
+    (200, lambda client, ctx: client.get("/sessions/", params={"group_id": 1, "order": "asc"})),
+    (200, lambda client, ctx: client.get("/sessions/", params={"group_id": 1, "upcoming": 5})),
+    (200, lambda client, ctx: client.get("/sessions/", params={"limit": 50, "include_archived": True})),
+    (200, lambda client, ctx: client.get("/sessions/", params={"group_id": 1, "stream": "ndjson"})),
+    (200, lambda client, ctx: client.get("/sessions/groups/1/calendar.ics")),
+    (200, lambda client, ctx: client.get(f"/sessions/{ctx.session_id}")),
+    (200, create_resource),
+    (200, bulk_resources),
+    (200, lambda client, ctx: client.get("/resources/", params={"limit": 50})),
+    (200, lambda client, ctx: client.put(f"/resources/{ctx.resource_id}", json={"title": "Budget renamed"})),
+    (200, lambda client, ctx: client.get("/search", params={"q": "group", "limit": 50})),
+    (200, lambda client, ctx: client.get("/changes", params={"since": 0, "limit": 50})),
+    (200, import_groups),
+    (200, lambda client, ctx: client.get("/data/export/groups", params={"format": "ndjson"}, headers=ctx.admin)),
+    (200, lambda client, ctx: client.get("/metrics")),
+    (200, lambda client, ctx: client.get("/")),
+    (404, lambda client, ctx: client.get("/no-such-route")),
+    (200, lambda client, ctx: client.delete(f"/sessions/{ctx.session_id}", headers=ctx.admin)),
+    (200, lambda client, ctx: client.delete(f"/groups/leave-group/{ctx.user_id}")),
+    (200, lambda client, ctx: client.put(f"/users/promote/{ctx.user_id}", headers=ctx.admin)),
+    (200, lambda client, ctx: client.delete(f"/groups/{ctx.group_id}", headers=ctx.admin)),
+    (200, lambda client, ctx: client.delete(f"/users/{ctx.user_id}", headers=ctx.admin)),
+]
+
+
+@pytest.fixture(scope="module")
+def query_log(client):
+    """Runs every case once and returns the SQL each request made."""
+    from core.metrics import metrics
+
+    ctx = Context()
+    with QueryLog(metrics) as log:
+        for expected, call in CASES:
+            response = call(client, ctx)
+            if response.status_code != expected:
+                log.unexpected.append(
+                    f"{response.request.method} {response.request.url.path}: "
+                    f"expected {expected}, got {response.status_code} {response.text[:200]}"
+                )
+    return log
+
+
+def test_cases_return_expected_status(query_log):
+    assert not query_log.unexpected, "\n".join(query_log.unexpected)
+
+
+# Bulk route -> call(client, ctx, size) whose items are all valid
+BULK_CALLS = {
+    "POST /sessions/bulk": bulk_sessions,
+    "POST /resources/bulk": bulk_resources,
+    "POST /groups/members/bulk": new_members,
+}
+
+
+@pytest.mark.parametrize("route", list(BULK_CALLS))
+def test_bulk_statements_do_not_depend_on_batch_size(client, route):
+    from core.metrics import metrics
+
+    ctx = Context()
+    login(client, ctx)
+    create_group(client, ctx)
+    with QueryLog(metrics) as log:
+        for size in (2, 10):
+            response = BULK_CALLS[route](client, ctx, size)
+            assert response.status_code == 200 and response.json()["created"] == size, response.text
+
+    small, large = (sql.queries for sql in log.requests[route])
+    assert small == large, f"{route}: {small} statements for 2 items, {large} for 10"
+
+
+def test_row_counting_hook_is_removed_after_capture(query_log):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from core.metrics import _count_rows
+
+    assert not event.contains(Session, "do_orm_execute", _count_rows)
+
+
+def test_every_route_has_a_budget(client):
+    from fastapi.routing import APIRoute
+
+    missing = [
+        route.path for route in client.app.routes
+        if isinstance(route, APIRoute)
+        and not any(f"{method} {route.path}" in BUDGETS or f"{method} {route.path}" in EXEMPT for method in route.methods)
+    ]
+    assert not missing, f"Routes without a budget: {missing}"
+
+
+@pytest.mark.parametrize("route", list(BUDGETS))
+def test_route_within_budget(query_log, route):
+    requests = query_log.requests.get(route)
+    assert requests, f"{route} has a budget but was not called"
+
+    max_queries, max_rows = BUDGETS[route]
+    worst = max(requests, key=lambda sql: (sql.queries, sql.rows))
+    queries = max(sql.queries for sql in requests)
+    rows = max(sql.rows for sql in requests)
+    statements = "\n".join(f"  {seconds * 1000:7.2f} ms  {' '.join(statement.split())[:160]}" for statement, seconds in worst.statements)
+    assert queries <= max_queries and rows <= max_rows, (
+        f"{route}: {queries} statements / {rows} rows, budget {max_queries} / {max_rows}\n{statements}"
+    )
@@ -0,0 +1,27 @@
+"""Loading of the reminder window."""
+from datetime import datetime, timedelta
+
+from benchmarks.seed import PASSWORD, email
+from core.reminders import LogSink, ReminderScheduler
+
+LEAD = timedelta(minutes=30)
+HORIZON = timedelta(hours=24)
+
+
+def test_session_on_the_window_boundary_is_loaded_once(client):
+    now = datetime(2031, 1, 1, 12, 0)
+    boundary = now + HORIZON
+    token = client.post("/auth/login", json={"email": email(1), "password": PASSWORD}).json()["access_token"]
+    response = client.post(
+        "/sessions/", json={"group_id": 4, "scheduled_time": boundary.isoformat()},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    session_id = response.json()["id"]
+
+    scheduler = ReminderScheduler(LogSink(), lead=LEAD, horizon=HORIZON, clock=lambda: now)
+    scheduler._loaded_until = now - LEAD
+    client.portal.call(scheduler._load, boundary - LEAD)
+    assert session_id not in scheduler._pending
+
+    client.portal.call(scheduler._load, boundary - LEAD + HORIZON)
+    assert scheduler._pending[session_id].remind_at == boundary - LEAD